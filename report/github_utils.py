@@ -3,27 +3,143 @@ Utilities to interact with GitHub
 """
 import os
 import time
+import gzip
+import random
+import threading
 import logging, requests, json
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from datetime import datetime
+from itertools import pairwise, chain
+from functools import lru_cache
+from operator import itemgetter
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, urlunparse, parse_qs, urlencode
+import re
+
+@lru_cache(maxsize=4096)
+def _parse_iso_date(date: str) -> datetime:
+    """Parse an ISO 8601 date, e.g. the date of a corpus version
+    The results are cached, because the dates of the versions are parsed over and over again."""
+    return datetime.fromisoformat(date)
+
+
+class RateLimitExceeded(Exception):
+    """Raised if the rate limit of the GitHub API is used up and waiting for the reset is not wanted"""
+
 
 class GitHubRepo():
     """Interact with a DraCor Github Repository"""
 
-    __github_api_base_url = "https://api.github.com/"
-    
-    # This holds the once downloaded commits of a repository. They are the source of truth of the whole analysis.
-    # This will be a list later
-    __commits = None
-    __commits_detailed = None
-
-    # based on the commits at some point corpus versions are created. This is a dictionary with the commits as keys 
-    __corpus_versions = None
+    # The state is held per instance (see __init__), the attributes are declared here
+    __slots__ = ("__github_access_token",
+                 "__repository_owner",
+                 "__repository_name",
+                 "__session",
+                 "__api_response_cache",
+                 "__commits",
+                 "__commits_detailed",
+                 "__commits_by_sha",
+                 "__commits_detailed_by_sha",
+                 "__corpus_versions",
+                 "__play_added_in_version",
+                 "__play_first_included_in_version",
+                 "__versions_modifying_play",
+                 "__versions_by_date",
+                 "__versions_df",
+                 "__playnames_sets",
+                 "__data_folder_objects",
+                 "__files_by_playname",
+                 "__data_folder_objects_df",
+                 "__source_distributions",
+                 "__source_distribution_by_version",
+                 "__years_of_corpus_version_dfs",
+                 "__years_of_corpus_version_series",
+                 "__latest_corpus_contents_from_api",
+                 "__latest_plays_by_name",
+                 "__sources",
+                 "__data_download_at"
+                 )
 
-    # GitHub API returns the "state" or however it is called of a folder. This dictionary holds these downloaded states of all versions.
-    # the key is the commit 
-    __data_folder_objects = None
+    __github_api_base_url = "https://api.github.com/"
+    __github_graphql_api_url = "https://api.github.com/graphql"
+
+    # Maximum number of requests that are sent to the GitHub API at the same time. GitHub does not like too many
+    # concurrent requests (secondary rate limit), so keep this low.
+    __max_concurrent_requests = 10
+
+    # Seconds to wait for the server to send data before giving up on a request
+    __request_timeout = 30
+
+    # Size of the write buffer when exporting data to a file (1 MB)
+    __export_buffer_size = 1024 * 1024
+
+    # Number of items requested per page of paginated results, 100 is the maximum allowed by the GitHub API
+    __items_per_page = 100
+
+    # Git objects requested by their sha (trees, commits) never change. Cached responses of these are used
+    # without asking GitHub if they have been modified.
+    __immutable_resource_url_pattern = re.compile(r"/(git/trees|commits)/[0-9a-f]{40}$")
+
+    # A single link in the HTTP Link header, e.g. <https://api.github.com/...&page=2>; rel="next"
+    __link_header_pattern = re.compile(r'<([^>]+)>;\s*rel="([^"]+)"')
+
+    # Characters of a source name that are replaced to generate the key of the source, e.g. "Google Books: x" -> "google_books__x"
+    __source_key_translation_table = str.maketrans({" ": "_", ":": "_"})
+
+    # GraphQL query to get the history of the default branch together with the files in the folders of the root folder
+    # of each commit. This replaces requesting the commits and the trees of each commit from the REST API.
+    __commit_history_with_files_query = """
+        query($owner: String!, $name: String!, $page_size: Int!, $cursor: String) {
+            repository(owner: $owner, name: $name) {
+                defaultBranchRef {
+                    target {
+                        ... on Commit {
+                            history(first: $page_size, after: $cursor) {
+                                pageInfo {
+                                    hasNextPage
+                                    endCursor
+                                }
+                                nodes {
+                                    oid
+                                    authoredDate
+                                    committedDate
+                                    author {
+                                        name
+                                        email
+                                    }
+                                    committer {
+                                        name
+                                        email
+                                    }
+                                    tree {
+                                        oid
+                                        entries {
+                                            name
+                                            type
+                                            oid
+                                            object {
+                                                ... on Tree {
+                                                    entries {
+                                                        name
+                                                        type
+                                                    }
+                                                }
+                                            }
+                                        }
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    """
 
     # Fields/columns that are available when requesting versions
     __corpus_version_data_fields = ["id", 
@@ -41,17 +157,6 @@ class GitHubRepo():
                   "documents_modified_count",
                   "non_document_files_affected_count"
                   ]
-    
-    # per version: how many files stem from which sources, e.g. Textgrid, Project Gutenberg
-    __source_distributions = None
-
-    # data returned by the API endpoint /corpora/{corpusname}
-    # can be used to interpolate information from the latest corpus version to others, e.g. sources of 
-    # individual files; no need to look into each file
-    __latest_corpus_contents_from_api = None
-
-    # Holds information about the sources for the corpus
-    __sources = None
 
 
     def __init__(self,
@@ -62,7 +167,10 @@ class GitHubRepo():
                  import_commit_list: str = None,
                  import_commit_details: str = None ,
                  import_data_folder_objects: str = None,
-                 import_corpus_versions: str = None
+                 import_corpus_versions: str = None,
+                 import_api_response_cache: str = None,
+                 import_latest_corpus_contents: str = None,
+                 use_graphql_api: bool = False
                  ):
         """Initialize
         
@@ -75,12 +183,103 @@ class GitHubRepo():
             import_commit_details (str, optional): Path to a file containing a previously downloaded commit details
             import_data_folder_objects (str, optional): Path to a file containing previously stored data folder objects
             import_corpus_versions (str, optional): Path to a file containing (possibly enriched) corpus versions. Enrichment won't be triggered automatically.
+            import_api_response_cache (str, optional): Path to a file containing previously stored responses of the GitHub API. 
+                Will be used to send conditional requests. Trees and commits in the cache are not downloaded again at all.
+            import_latest_corpus_contents (str, optional): Path to a file containing previously stored latest corpus contents
+                of the DraCor API. They are not fetched from the API then.
+            use_graphql_api (bool, optional): Use the GraphQL API to get the commits and the files of the corpus versions
+                when downloading and preparing the analysis. Needs far less requests, but requires a GitHub Access Token.
         """
         
         if github_access_token:
             self.__github_access_token = github_access_token
         else:
+            self.__github_access_token = None
             logging.warning("Should set a GitHub Access Token!")
+
+        # Session to reuse the connections to the GitHub API instead of opening a new connection for each request.
+        # The connection pool must be large enough for the concurrent requests. If all connections are in use, 
+        # requests wait for a free one (pool_block) instead of opening connections that are closed right after use.
+        # Transient server errors are retried with exponential backoff, a "Retry-After" header is respected.
+        self.__session = requests.Session()
+        self.__session.headers.update({"Accept": "application/vnd.github+json"})
+        self.__session.mount("https://", HTTPAdapter(
+            pool_connections=self.__max_concurrent_requests * 2,
+            pool_maxsize=self.__max_concurrent_requests * 2,
+            pool_block=True,
+            max_retries=Retry(total=5, backoff_factor=1.0, status_forcelist=[429, 502, 503, 504],
+                              respect_retry_after_header=True, raise_on_status=False)
+        ))
+
+        # This holds the once downloaded commits of a repository. They are the source of truth of the whole analysis.
+        # This will be a list later
+        self.__commits = None
+        self.__commits_detailed = None
+
+        # the commits by their sha, created from the commits when needed
+        self.__commits_by_sha = None
+        # the same for the detailed commits
+        self.__commits_detailed_by_sha = None
+
+        # based on the commits at some point corpus versions are created. This is a dictionary with the commits as keys 
+        self.__corpus_versions = None
+
+        # Indexes created from the corpus versions when needed, they must be reset if the corpus versions change.
+        # playname -> id of the version in which the play was added (is included in the "new_playnames")
+        self.__play_added_in_version = None
+        # playname -> id of the first version containing the play
+        self.__play_first_included_in_version = None
+        # playname -> ids of the versions modifying the play (is included in the "document_modified_playnames")
+        self.__versions_modifying_play = None
+        # the dates of the versions (date_from) sorted, and the positions and ids of the versions in the same order
+        self.__versions_by_date = None
+        # the fields of the versions that are used to select versions as data frame, the index is the id of the version
+        self.__versions_df = None
+        # id of the version -> frozenset of the playnames; kept outside of the versions, which are exported as JSON
+        self.__playnames_sets = None
+
+        # GitHub API returns the "state" or however it is called of a folder. This dictionary holds these downloaded states of all versions.
+        # the key is the commit 
+        self.__data_folder_objects = None
+
+        # Index created from the data folder objects when needed, must be reset if the data folder objects change.
+        # playname -> {id of the version: file object from the tree of the data folder}
+        self.__files_by_playname = None
+        # the files in the trees of all versions as data frame
+        self.__data_folder_objects_df = None
+
+        # per version: how many files stem from which sources, e.g. Textgrid, Project Gutenberg
+        self.__source_distributions = None
+        # the source distributions already calculated by the id of the version. They are based on the corpus versions 
+        # and the latest corpus contents from the API and must be reset if one of them changes.
+        self.__source_distribution_by_version = dict()
+
+        # the data frames with the years of the plays already created, the key is (id of the version, non_numbers_to_nan).
+        # Like the source distributions they must be reset if the corpus versions or the latest corpus contents change.
+        self.__years_of_corpus_version_dfs = dict()
+        # the same for a single type of year (numbers only), the key is (id of the version, name of the year column)
+        self.__years_of_corpus_version_series = dict()
+
+        # data returned by the API endpoint /corpora/{corpusname}
+        # can be used to interpolate information from the latest corpus version to others, e.g. sources of 
+        # individual files; no need to look into each file
+        self.__latest_corpus_contents_from_api = None
+        # the plays in the latest corpus contents by their name, created when needed
+        self.__latest_plays_by_name = None
+
+        # Holds information about the sources for the corpus
+        self.__sources = None
+
+        # Set when the data is downloaded in __fetch_and_prepare_analysis_data
+        self.__data_download_at = None
+
+        # Bodies of the responses of the GitHub API with their ETag/Last-Modified headers, the key is the request url.
+        # Used to send conditional requests: if nothing changed, GitHub answers with "304 Not Modified" which
+        # does not count against the rate limit.
+        self.__api_response_cache = dict()
+
+        if import_api_response_cache:
+            self.import_api_response_cache(file=import_api_response_cache)
         
         self.__repository_owner = repository_owner
 
@@ -89,7 +288,7 @@ class GitHubRepo():
         self.__repository_name = repository_name
 
         if download_and_prepare_analysis == True:
-            self.__fetch_and_prepare_analysis_data()
+            self.__fetch_and_prepare_analysis_data(use_graphql_api=use_graphql_api)
 
         if import_commit_list:
             self.import_commits(file=import_commit_list)
@@ -102,6 +301,9 @@ class GitHubRepo():
         
         if import_corpus_versions: 
             self.import_corpus_versions(file=import_corpus_versions)
+
+        if import_latest_corpus_contents:
+            self.import_latest_corpus_contents(file=import_latest_corpus_contents)
         
 
     def api_get(self, 
@@ -112,6 +314,8 @@ class GitHubRepo():
                 headers_only: bool = False,
                 return_response_object: bool = False,
                 wait_for_rate_limit_reset: bool = True,
+                use_cache: bool = True,
+                send_access_token: bool = True,
                 **kwargs):
         """Send GET requests to the GitHub API.
 
@@ -124,63 +328,78 @@ class GitHubRepo():
             parse_json (bool, optional): Parse the response as JSON. Defaults to True.
             headers_only (bool, optional): get the HTTP-Headers only. Defaults to False.
             return_response_object (bool, optional): Get the requests response instead of the parsed results. Defaults to False.
-
+            use_cache (bool, optional): Use cached responses. Defaults to True. If set to False, the resource is downloaded again.
+            send_access_token (bool, optional): Send the personal access token. Defaults to True. Set to False to 
+                request other APIs (e.g. DraCor) with the same session and cache.
+
+        Parsed JSON responses are cached. If a resource is requested again, a conditional request is sent and the 
+        cached data is returned if GitHub reports that the resource has not been modified. Trees and commits requested
+        by their sha can't change, the cached data of these is returned without sending a request at all. The body of
+        a response is cached and parsed again for every hit, so the returned data can be changed without changing the cache.
         """
         # Base-URL of the GitHub API
         github_api_base_url = self.__github_api_base_url
         
-        if self.__github_access_token is not None:
-            if headers is not None:
-                headers["Authorization"] = f"Bearer {self.__github_access_token}"
-            else:
-                headers = dict(
-                    Authorization=f"Bearer {self.__github_access_token}"
-                )
+        # copy the headers, the dictionary passed in by the caller should not be changed
+        if headers is not None:
+            headers = dict(headers)
+        else:
+            headers = dict()
+
+        if self.__github_access_token is not None and send_access_token is True:
+            headers["Authorization"] = f"Bearer {self.__github_access_token}"
 
         if api_call is not None and url is None:
             request_url = f"{self.__github_api_base_url}{api_call}"
-            logging.debug(f"Send GET request to GitHub: {request_url}")
+            logging.debug("Send GET request to GitHub: %s", request_url)
         elif url is not None:
             request_url = url
-            logging.debug(f"Provided full URL to send GET request to GitHub: {request_url}.")
+            logging.debug("Provided full URL to send GET request to GitHub: %s.", request_url)
         else:
             request_url = self.__github_api_base_url
-            logging.debug(f"No specialized API call (api_call) provided. Will send GET request to GitHub API "
-                          f" base url.")
+            logging.debug("No specialized API call (api_call) provided. Will send GET request to GitHub API "
+                          " base url.")
 
-        if headers is not None:
-            r = requests.get(url=request_url, headers=headers)
-        else:
-            r = requests.get(url=request_url)
+        # only the parsed JSON is cached, so conditional requests can not be used if something else is requested
+        use_response_cache = parse_json is True and headers_only is False and return_response_object is False
+        is_immutable_resource = self.__immutable_resource_url_pattern.search(urlparse(request_url).path) is not None
+        
+        cached_response = None
+        if use_response_cache is True and use_cache is True and request_url in self.__api_response_cache:
+            cached_response = self.__api_response_cache[request_url]
+
+            if is_immutable_resource is True:
+                logging.debug("Using cached response of immutable resource %s.", request_url)
+                return json.loads(cached_response["body"])
+
+            if cached_response["etag"] is not None:
+                headers["If-None-Match"] = cached_response["etag"]
+            if cached_response["last_modified"] is not None:
+                headers["If-Modified-Since"] = cached_response["last_modified"]
+
+        r = self.__session.get(url=request_url, headers=headers, timeout=self.__request_timeout)
 
         # logging.debug(r.headers)
-        if "X-RateLimit-Remaining" in r.headers:
-            if int(r.headers["X-RateLimit-Remaining"]) == 0:
-                logging.warning(f"Used up rate limit of {r.headers['X-RateLimit-Limit']}.")
-                logging.debug(r.headers)
-                
-                if wait_for_rate_limit_reset is True:
-                    resets_at_time = int(r.headers['X-RateLimit-Reset'])
-                    logging.debug(f"Limit will reset at Unix Epoch: {str(resets_at_time)}")
-                    current_unix_epoch = int(datetime.now().timestamp())
-                    logging.debug(f"Current Unix Epoch: {str(current_unix_epoch)}")
-                    remaining_seconds = resets_at_time - current_unix_epoch
-                    logging.warning(f"Rate limit will reset in {str(remaining_seconds)} seconds. Will wait until then ...")
-
-                    time.sleep(remaining_seconds + 60)
-                    logging.warning(f"Resuming operation ... will fetch data from {request_url} next.")
-                    if headers is not None:
-                        r = requests.get(url=request_url, headers=headers)
-                    else:
-                        r = requests.get(url=request_url)
-                else:
-                    raise Exception(f"Used up GitHub API rate limit and don't want to wait because {wait_for_rate_limit_reset} is set to false.")
+        while self.__is_rate_limited(r) is True:
+            logging.warning("Hit rate limit of the GitHub API (status code %d).", r.status_code)
+            logging.debug(r.headers)
+
+            if wait_for_rate_limit_reset is False:
+                raise RateLimitExceeded("Used up GitHub API rate limit and don't want to wait because wait_for_rate_limit_reset is set to false.")
+
+            waiting_time = self.__get_rate_limit_waiting_time(r.headers)
+            logging.warning("Rate limit will reset in %.0f seconds. Will wait until then ...", waiting_time)
+            time.sleep(waiting_time)
+            
+            logging.warning("Resuming operation ... will fetch data from %s next.", request_url)
+            r = self.__session.get(url=request_url, headers=headers, timeout=self.__request_timeout)
 
-            elif 1 < int(r.headers["X-RateLimit-Remaining"]) < 5:
-                logging.warning(f"Approaching maximum API calls (rate limit). Remaining: "
-                                f" {r.headers['X-RateLimit-Remaining']}")
-            elif int(r.headers["X-RateLimit-Remaining"] == 1):
-                logging.warning(f"Reached rate limit of {r.headers['X-RateLimit-Limit']}.")
+        if "X-RateLimit-Remaining" in r.headers:
+            if 1 < int(r.headers["X-RateLimit-Remaining"]) < 5:
+                logging.warning("Approaching maximum API calls (rate limit). Remaining: %s", 
+                                r.headers["X-RateLimit-Remaining"])
+            elif int(r.headers["X-RateLimit-Remaining"]) <= 1:
+                logging.warning("Reached rate limit of %s.", r.headers["X-RateLimit-Limit"])
                 if self.__github_access_token is None:
                     logging.warning("Requests to GitHub API are probably unauthorized. Provide a personal "
                                     "access token to get a higher rate limit. "
@@ -188,6 +407,10 @@ class GitHubRepo():
                                     "keeping-your-account-and-data-secure/managing-your-personal-access-tokens"
                                     "#creating-a-personal-access-token-classic")
 
+        # requests asks for compressed responses (Accept-Encoding), this allows to check if GitHub sends them
+        logging.debug("Received %d bytes from %s (Content-Encoding: %s).", 
+                      len(r.content), request_url, r.headers.get("Content-Encoding"))
+
         if headers_only is True:
             logging.debug("Returning headers only")
             return r.headers
@@ -195,95 +418,239 @@ class GitHubRepo():
         if return_response_object is True:
             return r
 
+        if r.status_code == 304 and cached_response is not None:
+            logging.debug("Resource %s has not been modified. Using cached response.", request_url)
+            return json.loads(cached_response["body"])
+
         if r.status_code == 200:
-            logging.debug(f"GET request to GitHub API was successful.")
+            logging.debug("GET request to GitHub API was successful.")
             if parse_json is True:
-                data = json.loads(r.text)
+                # parse the raw bytes, decoding them to a string first (r.text) is not necessary
+                data = json.loads(r.content)
+                if use_response_cache is True and ("ETag" in r.headers or "Last-Modified" in r.headers or is_immutable_resource):
+                    # the body and not the parsed data is cached, parsing it again is cheaper than copying the data
+                    # and callers may change the returned data
+                    self.__api_response_cache[request_url] = dict(
+                        etag=r.headers.get("ETag"),
+                        last_modified=r.headers.get("Last-Modified"),
+                        body=r.content.decode("utf-8")
+                    )
                 return data
             else:
                 return r.text
         # TODO implement the other status codes
         else:
-            logging.debug(f"GET request was not successful. Server returned status code: {str(r.status_code)}.")
+            logging.debug("GET request was not successful. Server returned status code: %s.", r.status_code)
+            logging.debug(r.text)
+    
+    def __is_rate_limited(self, r) -> bool:
+        """Check if a request was rejected because of the (primary or secondary) rate limit of the GitHub API"""
+        if r.status_code not in [403, 429]:
+            return False
+        
+        # primary rate limit: requests per hour
+        if r.headers.get("X-RateLimit-Remaining") == "0":
+            return True
+        
+        # secondary rate limit: too many requests at the same time, GitHub tells how long to wait
+        return "Retry-After" in r.headers
+
+    def __get_rate_limit_waiting_time(self, headers) -> float:
+        """Get the seconds to wait until a rate limited request can be sent again
+        
+        Some random time (up to 10 %) is added, so that concurrent requests don't all resume at the same time.
+        """
+        if "Retry-After" in headers:
+            waiting_time = int(headers["Retry-After"])
+        elif "X-RateLimit-Reset" in headers:
+            resets_at_time = int(headers["X-RateLimit-Reset"])
+            logging.debug("Limit will reset at Unix Epoch: %d", resets_at_time)
+            current_unix_epoch = int(datetime.now().timestamp())
+            logging.debug("Current Unix Epoch: %d", current_unix_epoch)
+            waiting_time = resets_at_time - current_unix_epoch
+        else:
+            # GitHub recommends to wait at least a minute if it does not tell how long
+            waiting_time = 60
+
+        # the clocks of GitHub and this machine might not be exactly the same, so wait at least a second
+        waiting_time = max(waiting_time, 1)
+        
+        return waiting_time * random.uniform(1.0, 1.1)
+
+    def graphql_post(self,
+                     query: str = None,
+                     variables: dict = None) -> dict:
+        """Send a query to the GitHub GraphQL API.
+
+        Args:
+            query (str, required): GraphQL query
+            variables (dict, optional): Values of the variables used in the query
+
+        Returns the "data" of the response.
+        """
+        assert query is not None, "Must supply a query!"
+        assert self.__github_access_token is not None, "The GitHub GraphQL API can only be used with a GitHub Access Token!"
+
+        headers = dict(
+            Authorization=f"Bearer {self.__github_access_token}"
+        )
+
+        if variables is None:
+            variables = dict()
+
+        logging.debug("Send query to GitHub GraphQL API with variables %s.", variables)
+        r = self.__session.post(url=self.__github_graphql_api_url, headers=headers, json=dict(query=query, variables=variables),
+                                timeout=self.__request_timeout)
+
+        if r.status_code == 200:
+            response_data = json.loads(r.content)
+            # GraphQL reports errors in the body, the status code is 200 anyway
+            if "errors" in response_data:
+                raise Exception(f"GraphQL query failed: {response_data['errors']}")
+            return response_data["data"]
+        else:
             logging.debug(r.text)
+            raise Exception(f"GraphQL query failed. Server returned status code: {str(r.status_code)}.")
+
+    def store_api_response_cache(self, 
+                                 folder_name:str = "export",
+                                 file_name: str = None,
+                                 compress: bool = False):
+        """Save the cached responses of the GitHub API
+        
+        Args:
+            compress (bool, optional): Write a gzip compressed file (.json.gz). Defaults to False
+        """
+        if file_name is None:
+            file_name = f"{self.__repository_name}_api_response_cache"
+        
+        self.__dump_json(self.__api_response_cache, f"{folder_name}/{file_name}.json", compress=compress, ensure_ascii=False)
     
-    def __parse_link_headers(self, headers):
+    def import_api_response_cache(self,
+                                  file:str = None):
+        """Import saved responses of the GitHub API"""
+        data = self.__load_json(file)
+
+        # responses stored with an earlier version contain the parsed data instead of the body
+        for cached_response in data.values():
+            if "data" in cached_response:
+                cached_response["body"] = json.dumps(cached_response.pop("data"))
+        
+        self.__api_response_cache.update(data)
+        logging.info("Imported cached API responses from %s.", file)
+
+    def __dump_json(self, data, file_path: str, compress: bool = False, ensure_ascii: bool = True):
+        """Write data to a JSON file
+        json.dump writes the data in chunks instead of creating the whole JSON string in memory first.
+        If compress is True, the file is gzip compressed and '.gz' is appended to the file path.
+        """
+        if compress is True:
+            with gzip.open(f"{file_path}.gz", "wt", encoding='utf8') as f:
+                json.dump(data, f, ensure_ascii=ensure_ascii)
+        else:
+            with open(file_path, "w", encoding='utf8', buffering=self.__export_buffer_size) as f:
+                json.dump(data, f, ensure_ascii=ensure_ascii)
+
+    def __load_json(self, file: str):
+        """Read data from a JSON file, files ending in '.gz' are decompressed
+        The file is read as bytes and parsed at once, json.loads detects the encoding (UTF-8) itself.
+        """
+        if file.endswith(".gz"):
+            with gzip.open(file, "rb") as f:
+                return json.loads(f.read())
+        else:
+            with open(file, "rb") as f:
+                return json.loads(f.read())
+
+    def __parse_link_headers(self, headers) -> dict:
         """ Parse HTTP Link headers
-        expects requests object headers"""
-        # this fails here if the rate limit is exceded
-        # if this happens, there are no link headers...
-        #logging.debug(headers)
-        assert "Link" in headers, "No link headers available"
-
-        link_headers= dict()
-
-        links = headers["Link"].split(", ")
-        for link in links:
-            # extracting would be nicer as a regex....
-            url = link.split("; ")[0].replace(">","").replace("<","")
-            rel = link.split("; ")[1].replace('rel="','').replace('"','')
+        expects requests object headers
+        
+        Returns a dictionary with the relation (e.g. "next", "last") as key and the url as value. The dictionary 
+        is empty if there are no link headers, e.g. if there is only one page of results or if the rate limit is exceeded.
+        """
+        if "Link" not in headers:
+            return dict()
+
+        # the pattern returns (url, rel) tuples, but the rel is used as key
+        link_headers = dict()
+        for url, rel in self.__link_header_pattern.findall(headers["Link"]):
             link_headers[rel] = url
         
         return link_headers
 
+    def __generate_page_urls(self, last_page_url: str, first_page: int = 1) -> list:
+        """Generate the URLs of all pages of paginated results up to the page linked as "last" in the Link headers
+
+        Args:
+            last_page_url (str): URL of the last page (rel="last")
+            first_page (int, optional): Number of the first page to generate an URL for. Defaults to 1.
+        """
+        parsed_url = urlparse(last_page_url)
+        query = parse_qs(parsed_url.query)
+        last_page = int(query["page"][0])
+
+        page_urls = []
+        for page in range(first_page, last_page + 1):
+            query["page"] = [str(page)]
+            page_urls.append(urlunparse(parsed_url._replace(query=urlencode(query, doseq=True))))
+        
+        return page_urls
+
     def get_commits(self, 
                     headers_only:bool = False,
                     force_download:bool = False):
-        """Get commits"""
+        """Get commits
+        
+        The first page is requested to get the number of pages from the "last" Link header, all other pages
+        are then fetched concurrently.
+        """
         
         if self.__commits is not None and force_download is False:
             return self.__commits
         else:
             logging.debug("Fetching commits from GitHub ...")
 
-            api_call = f"repos/{self.__repository_owner}/{self.__repository_name}/commits"
+            api_call = f"repos/{self.__repository_owner}/{self.__repository_name}/commits?per_page={self.__items_per_page}"
 
             if headers_only is True:
                 return self.api_get(api_call=api_call, headers_only=True)
         
             else:
-                all_commits_list_of_lists = []
-            
-                has_pages_left = True
-                # this will be used in the next round
-                url = None
-
-                while has_pages_left is True:
-                    logging.debug(f"Will get results from {url}")
-                    r = self.api_get(api_call=api_call, url=url, return_response_object=True)
-                    link_headers = self.__parse_link_headers(r.headers)
-
-                    if "next" not in link_headers:
-                        # this is the exit condition
-                        has_pages_left = False
-
-                    parsed_commits = json.loads(r.text)
-                    all_commits_list_of_lists.append(parsed_commits)
-
-                    if "next" in link_headers:
-                        url=link_headers["next"]
-                    else:
-                        logging.debug("Nothing more to get")
-                        break
+                r = self.api_get(api_call=api_call, return_response_object=True)
+                all_commits = json.loads(r.content)
+
+                # there are no link headers if all commits fit on a single page
+                link_headers = self.__parse_link_headers(r.headers)
+
+                if "last" in link_headers:
+                    page_urls = self.__generate_page_urls(link_headers["last"], first_page=2)
+                    logging.debug("Will get %d more pages of commits.", len(page_urls))
+
+                    with ThreadPoolExecutor(max_workers=self.__max_concurrent_requests) as executor:
+                        # map returns the results in the order of the page urls, so the order of the commits is kept
+                        for commits_on_page in executor.map(lambda url: self.api_get(url=url), page_urls):
+                            if commits_on_page is None:
+                                raise Exception("Fetching a page of commits failed.")
+                            all_commits.extend(commits_on_page)
                 
                 logging.debug("Done fetching commits.")
-
-                # flatten the list of lists...
-                all_commits = []
-            
-                for commits_list in all_commits_list_of_lists:
-                    for commit in commits_list:
-                        all_commits.append(commit)
                 
                 # store them so no need to download again
                 self.__commits = all_commits
+                self.__commits_by_sha = None
             
                 return all_commits
     
     def store_commits(self, 
                      folder_name:str = "export",
-                     file_name: str = None):
-        """Save the downloaded commits"""
+                     file_name: str = None,
+                     compress: bool = False):
+        """Save the downloaded commits
+        
+        Args:
+            compress (bool, optional): Write a gzip compressed file (.json.gz). Defaults to False
+        """
         if self.__commits is None:
             logging.critical("No commits downloaded. Aborting.")
             raise Exception("No commits downloaded.")
@@ -291,18 +658,16 @@ class GitHubRepo():
         if file_name is None:
             file_name = f"{self.__repository_name}_commits"
     
-
-        with open(f"{folder_name}/{file_name}.json", "w") as f:
-            f.write(json.dumps(self.__commits))
+        self.__dump_json(self.__commits, f"{folder_name}/{file_name}.json", compress=compress)
     
     def import_commits(self,
                        file:str = None):
         """Import saved commits"""
-        with open(file, "r") as f:
-            data = json.load(f)
+        data = self.__load_json(file)
         
         self.__commits = data
-        logging.info(f"Imported commits from {file}.")
+        self.__commits_by_sha = None
+        logging.info("Imported commits from %s.", file)
     
     def __transform_commits_to_versions(self):
         """Create corpus version stubs from commits"""
@@ -311,26 +676,24 @@ class GitHubRepo():
 
         versions = dict()
 
-        commits_reversed = self.__commits
         # reverse the list, last item in the commits history is actually the first version
-        commits_reversed.reverse()
-        n=0
-        for item in commits_reversed:
-            version = dict(
+        # the commits themselves are not reversed, they stay in the order returned by GitHub
+        commits_reversed = list(reversed(self.__commits))
+        
+        for running_number, item in enumerate(commits_reversed, start=1):
+            versions[item["sha"]] = dict(
                 id=item["sha"],
-                running_number=n+1,
+                running_number=running_number,
                 date_from = item["commit"]["committer"]["date"]
             )
-            # if it is not the very last
-            if n+1 != len(commits_reversed):
-                #get the date of the next
-                version["date_until"] = commits_reversed[n+1]["commit"]["committer"]["date"]
-
-            versions[item["sha"]] = version
-            n=n+1
+        
+        # a version is valid until the next one is created, the very last has no end date
+        for item, next_item in pairwise(commits_reversed):
+            versions[item["sha"]]["date_until"] = next_item["commit"]["committer"]["date"]
 
         self.__corpus_versions = versions
-        logging.debug(f"Added basic information of {len(commits_reversed)} versions.")
+        self.__reset_corpus_version_indexes()
+        logging.debug("Added basic information of %d versions.", len(commits_reversed))
 
     def get_corpus_versions(self):
         if self.__corpus_versions:
@@ -339,17 +702,34 @@ class GitHubRepo():
             self.__transform_commits_to_versions()
             return self.__corpus_versions
 
+    def __get_commit_by_sha(self, sha:str = None) -> dict:
+        """Get a commit by its sha"""
+        # building the lookup once is much faster than searching the list of commits for every commit
+        # it is filled before it is assigned, because it might be used by several threads at the same time
+        if self.__commits_by_sha is None:
+            commits_by_sha = dict()
+            for commit in self.__commits:
+                commits_by_sha[commit["sha"]] = commit
+            self.__commits_by_sha = commits_by_sha
+        
+        return self.__commits_by_sha[sha]
+
     def __fetch_xml_files_by_commit(self,
                                                 commit:str = None,
-                                                data_folder_name="tei"):
+                                                data_folder_name="tei") -> dict:
         """Get the documents (=tei files) in the data folder
+
+        Returns a dictionary with the fields to add to the corpus version of the commit. The corpus versions are not
+        changed here, this allows to fetch the files of multiple commits at the same time.
         """
         assert commit is not None, "Must provide a commit sha!"
         assert self.__commits, "Commits must have been loaded!"
         
-        # this is a way to get the commit from the list by commit sha
-        commit_data = list(filter(lambda item: item["sha"] == commit, self.__commits))[0]
+        commit_data = self.__get_commit_by_sha(commit)
         #logging.debug(commit_data)
+
+        version_data = dict()
+        file_objects = None
         
         # get the url of tree
         tree = commit_data["commit"]["tree"]
@@ -360,36 +740,34 @@ class GitHubRepo():
             if repository_root_folder["truncated"] is True:
                 logging.warning("Not all items in the root folder of the repository are included in the response.")
 
-            tree_objects_in_root_folder = repository_root_folder["tree"]
-            data_folder_object_candidates = list(filter(lambda item: item["path"] == data_folder_name,
-                                             tree_objects_in_root_folder))
-            if len(data_folder_object_candidates) == 1:
-                data_folder_object = data_folder_object_candidates[0]
+            tree_objects_in_root_folder = dict()
+            for tree_object in repository_root_folder["tree"]:
+                tree_objects_in_root_folder[tree_object["path"]] = tree_object
+
+            if data_folder_name in tree_objects_in_root_folder:
+                data_folder_object = tree_objects_in_root_folder[data_folder_name]
                 #logging.debug(data_folder_object)
-                logging.debug(f"Found data folder '{data_folder_name}' in tree objects. "
-                            f" sha: {data_folder_object['sha']}, url: {data_folder_object['url']}.")
-                if self.__corpus_versions is not None:
-                    self.__corpus_versions[commit]["data_folder_github_url"] = data_folder_object['url']
-                    self.__corpus_versions[commit]["data_folder_name"] = data_folder_name
+                logging.debug("Found data folder '%s' in tree objects.  sha: %s, url: %s.", 
+                              data_folder_name, data_folder_object['sha'], data_folder_object['url'])
+                version_data["data_folder_github_url"] = data_folder_object['url']
+                version_data["data_folder_name"] = data_folder_name
             else: 
-                logging.debug(f"Could not find data folder {data_folder_name} of commit {commit}.")
-                logging.debug(f"Trying to find alternative folder 'data' of commit {commit}.")
-                data_folder_object_candidates = list(filter(lambda item: item["path"] == "data",
-                                             tree_objects_in_root_folder))
-                if len(data_folder_object_candidates) == 1:
-                    logging.debug(f"Detected data folder 'data'. Will use this.")
-                    data_folder_object = data_folder_object_candidates[0]
-                    self.__corpus_versions[commit]["data_folder_github_url"] = data_folder_object['url']
-                    self.__corpus_versions[commit]["data_folder_name"] = "data"
+                logging.debug("Could not find data folder %s of commit %s.", data_folder_name, commit)
+                logging.debug("Trying to find alternative folder 'data' of commit %s.", commit)
+                if "data" in tree_objects_in_root_folder:
+                    logging.debug("Detected data folder 'data'. Will use this.")
+                    data_folder_object = tree_objects_in_root_folder["data"]
+                    version_data["data_folder_github_url"] = data_folder_object['url']
+                    version_data["data_folder_name"] = "data"
                 else:
                     data_folder_object = None
                 
         else:
-            logging.warning(f"GET request to get the data '{data_folder_name}' folder failed!")
+            logging.warning("GET request to get the data '%s' folder failed!", data_folder_name)
             data_folder_object = None
 
         if data_folder_object is not None:
-            logging.debug(f"Getting files in the data folder.")
+            logging.debug("Getting files in the data folder.")
             parsed_data_folder_tree_object = self.api_get(url=data_folder_object["url"])
 
             # This is not the very best check in the world
@@ -400,44 +778,152 @@ class GitHubRepo():
                     raise Exception("Really need to implement this, data is not correct!")
 
                 file_objects = parsed_data_folder_tree_object["tree"]
-                logging.debug(f"Found {len(file_objects)} files in the data folder tree.")
+                logging.debug("Found %d files in the data folder tree.", len(file_objects))
                 #logging.debug(file_objects)
-                if self.__corpus_versions is not None:
-                    self.__corpus_versions[commit]["document_count"] = len(file_objects)
-
-        if file_objects is not None:
-            playnames = []
-            for file_object in file_objects:
-                filename = file_object["path"]
-                if ".xml" in filename:
-                    playnames.append(filename.split(".xml")[0])
-            logging.debug(playnames)
-            if self.__corpus_versions is not None:
-                self.__corpus_versions[commit]["playnames"] = playnames
+                version_data["document_count"] = len(file_objects)
+
+        if file_objects is None:
+            raise Exception(f"Could not get the files in the data folder of commit {commit}.")
+
+        playnames = self.__get_playnames_from_filenames([file_object["path"] for file_object in file_objects])
+        logging.debug(playnames)
+        version_data["playnames"] = playnames
+
+        return version_data
+
+    def __get_playnames_from_filenames(self, filenames: list) -> list:
+        """Get the playnames from the names of the files in the data folder
+        Only files ending in '.xml' are documents, e.g. not 'corpus.xml.bak'."""
+        return [filename[:-4] for filename in filenames if filename.endswith(".xml")]
     
+    def __fetch_xml_files_by_commit_with_fallback(self,
+                                                  commit:str = None,
+                                                  data_folder_name:str = "tei"):
+        """Get the documents in the data folder, retry with the fallback data folder name 'data' if this fails
+        
+        Returns the data to add to the corpus version or None if fetching the files failed.
+        """
+        logging.debug("Fetching files for %s.", commit)
+        try:
+            version_data = self.__fetch_xml_files_by_commit(commit=commit, data_folder_name=data_folder_name)
+            logging.debug("Success!")
+            return version_data
+        except:
+            # this might fail for the early commits of a corpus, in the case of "gerdracor" 
+            # the folder is not called "tei" but "data"
+            logging.debug("Fetching files failed with data folder name %s for %s. Will try again with fallback data folder name 'data'.", data_folder_name, commit)
+            try:
+                version_data = self.__fetch_xml_files_by_commit(commit=commit, data_folder_name="data")
+                logging.debug("Success with fallback folder name!")
+                return version_data
+            except:
+                logging.warning("Fetching files with data folder name %s and fallback 'data' failed for %s.", data_folder_name, commit)
+                return None
+
     def add_files_to_versions(self, 
                               version=None, 
                               data_folder_name:str = "tei"):
+        """Add the documents in the data folder to the corpus versions
+        
+        If no version is given, the files of all versions are fetched concurrently.
+        """
         if version is None:
-            commits = self.__corpus_versions.keys()
-            for commit in commits:
-                logging.debug(f"Fetching files for {commit}.")
-                try:
-                    self.__fetch_xml_files_by_commit(commit=commit, data_folder_name=data_folder_name)
-                    logging.debug("Success!")
-                except:
-                    # this might fail for the early commits of a corpus, in the case of "gerdracor" 
-                    # the folder is not called "tei" but "data"
-                    logging.debug(f"Fetching files failed with data folder name {data_folder_name} for {commit}. Will try again with fallback data folder name 'data'.")
-                    try:
-                        self.__fetch_xml_files_by_commit(commit=commit, data_folder_name="data")
-                        logging.debug("Success with fallback folder name!")
-                    except:
-                        logging.warning(f"Fetching files with data folder name {data_folder_name} and fallback 'data' failed for {commit}.")
+            commits = list(self.__corpus_versions.keys())
+            with ThreadPoolExecutor(max_workers=self.__max_concurrent_requests) as executor:
+                versions_data = executor.map(lambda commit: self.__fetch_xml_files_by_commit_with_fallback(
+                    commit=commit, data_folder_name=data_folder_name), commits)
+                
+                # the results are merged here and not in the threads, so the corpus versions are only changed by one thread
+                for commit, version_data in zip(commits, versions_data):
+                    if version_data is not None:
+                        self.__corpus_versions[commit].update(version_data)
+                
+                self.__reset_corpus_version_indexes()
 
         else:
-            self.__fetch_xml_files_by_commit(commit=version, data_folder_name=data_folder_name)
+            version_data = self.__fetch_xml_files_by_commit(commit=version, data_folder_name=data_folder_name)
+            if self.__corpus_versions is not None:
+                self.__corpus_versions[version].update(version_data)
+                self.__reset_corpus_version_indexes()
     
+    def fetch_commits_and_files_with_graphql(self,
+                                             data_folder_name:str = "tei",
+                                             page_size:int = 25):
+        """Get the commits and the documents in the data folder of each commit with the GraphQL API
+
+        Replaces getting the commits (get_commits), creating the corpus versions and adding the files to them 
+        (add_files_to_versions). Instead of several requests per commit only one request per page of commits is needed.
+        The commits are stored in a reduced form that contains the author, the committer and the tree of each commit.
+
+        Args:
+            data_folder_name (str, optional): Name of the folder containing the documents. Defaults to 'tei', 
+                'data' is used as a fallback.
+            page_size (int, optional): Number of commits requested at once. Each commit includes all files 
+                in the data folder, so the query gets expensive if this is too high. Defaults to 25.
+        """
+        commits = []
+        versions_data = dict()
+
+        variables = dict(
+            owner=self.__repository_owner,
+            name=self.__repository_name,
+            page_size=page_size,
+            cursor=None
+        )
+
+        has_pages_left = True
+        while has_pages_left is True:
+            data = self.graphql_post(query=self.__commit_history_with_files_query, variables=variables)
+            history = data["repository"]["defaultBranchRef"]["target"]["history"]
+
+            for node in history["nodes"]:
+                tree_url = f"{self.__github_api_base_url}repos/{self.__repository_owner}/{self.__repository_name}/git/trees/{node['tree']['oid']}"
+                # same structure as the commits returned by the REST API; the dates of the commit are used instead of the 
+                # date of the author and committer (GitTimestamp), they are in UTC like the dates returned by the REST API
+                commits.append(dict(
+                    sha=node["oid"],
+                    commit=dict(
+                        author=dict(name=node["author"]["name"], email=node["author"]["email"], date=node["authoredDate"]),
+                        committer=dict(name=node["committer"]["name"], email=node["committer"]["email"], date=node["committedDate"]),
+                        tree=dict(sha=node["tree"]["oid"], url=tree_url)
+                    )
+                ))
+
+                root_folder_entries = dict()
+                for entry in node["tree"]["entries"]:
+                    root_folder_entries[entry["name"]] = entry
+                
+                if data_folder_name in root_folder_entries:
+                    data_folder_entry = root_folder_entries[data_folder_name]
+                elif "data" in root_folder_entries:
+                    data_folder_entry = root_folder_entries["data"]
+                else:
+                    logging.warning("Could not find data folder %s or 'data' of commit %s.", data_folder_name, node["oid"])
+                    continue
+
+                file_entries = data_folder_entry["object"]["entries"]
+                versions_data[node["oid"]] = dict(
+                    data_folder_github_url=f"{self.__github_api_base_url}repos/{self.__repository_owner}/{self.__repository_name}/git/trees/{data_folder_entry['oid']}",
+                    data_folder_name=data_folder_entry["name"],
+                    document_count=len(file_entries),
+                    playnames=self.__get_playnames_from_filenames([file_entry["name"] for file_entry in file_entries])
+                )
+
+            logging.debug("Fetched %d commits with GraphQL.", len(commits))
+            has_pages_left = history["pageInfo"]["hasNextPage"]
+            variables["cursor"] = history["pageInfo"]["endCursor"]
+
+        self.__commits = commits
+        self.__commits_by_sha = None
+        self.__transform_commits_to_versions()
+
+        for commit, version_data in versions_data.items():
+            self.__corpus_versions[commit].update(version_data)
+        
+        self.__reset_corpus_version_indexes()
+        
+        return True
+
     def get_corpus_version(self, version:str = None) -> dict:
         """Get data of a single corpus version
         
@@ -452,8 +938,13 @@ class GitHubRepo():
     def store_corpus_versions(self, 
                      folder_name:str = "export",
                      file_name: str = None,
-                     ensure_ascii: bool = False):
-        """Save the downloaded corpus versions"""
+                     ensure_ascii: bool = False,
+                     compress: bool = False):
+        """Save the downloaded corpus versions
+        
+        Args:
+            compress (bool, optional): Write a gzip compressed file (.json.gz). Defaults to False
+        """
         if self.__corpus_versions is None:
             logging.critical("No versions created. Aborting.")
             raise Exception("No versions created.")
@@ -461,18 +952,16 @@ class GitHubRepo():
         if file_name is None:
             file_name = f"{self.__repository_name}_corpus_versions"
     
-
-        with open(f"{folder_name}/{file_name}.json", "w", encoding='utf8') as f:
-            f.write(json.dumps(self.__corpus_versions, ensure_ascii=ensure_ascii))
+        self.__dump_json(self.__corpus_versions, f"{folder_name}/{file_name}.json", compress=compress, ensure_ascii=ensure_ascii)
     
     def import_corpus_versions(self,
                        file:str = None):
         """Import saved corpus versions"""
-        with open(file, "r") as f:
-            data = json.load(f)
+        data = self.__load_json(file)
         
         self.__corpus_versions = data
-        logging.info(f"Imported versions from {file}.")
+        self.__reset_corpus_version_indexes()
+        logging.info("Imported versions from %s.", file)
 
     def get_corpus_versions_as_dict(self,
                                 fields:list = None) -> dict:
@@ -492,16 +981,7 @@ class GitHubRepo():
         data = dict()
     
         for field in fields:
-            data[field] = []
-
-        for key in self.__corpus_versions.keys():
-            version = self.__corpus_versions[key] 
-        
-            for field in fields:
-                if field in version:
-                    data[field].append(version[field])
-                else:
-                    data[field].append(None)
+            data[field] = [version.get(field) for version in self.__corpus_versions.values()]
 
         return data
 
@@ -510,18 +990,21 @@ class GitHubRepo():
                                   sort: bool = True,
                                   sort_by_column:str = "running_numbers") -> pd.DataFrame:
         """Get information on the versions as pandas data frame"""
+
+        assert self.__corpus_versions, "Corpus Versions must be generated first!" 
         
         if columns is None:
             # use the default columns
             columns = self.__corpus_version_data_fields
 
-        df = pd.DataFrame(self.get_corpus_versions_as_dict(fields=columns))
+        # pandas selects the columns from the version dictionaries, missing fields are empty (NaN)
+        df = pd.DataFrame.from_records(list(self.__corpus_versions.values()), columns=columns)
         
-        # some conversions
+        # some conversions; the dates are ISO 8601 strings, knowing the format pandas does not need to guess it
         if "date_from" in columns:
-            df["date_from"] = pd.to_datetime(df["date_from"])
+            df["date_from"] = pd.to_datetime(df["date_from"], format="ISO8601")
         if "date_until" in columns:
-            df["date_until"] = pd.to_datetime(df["date_until"])
+            df["date_until"] = pd.to_datetime(df["date_until"], format="ISO8601")
         
         if sort == True and sort_by_column in columns:
             df = df.sort_values(sort_by_column)
@@ -560,24 +1043,25 @@ class GitHubRepo():
         version_2 = self.__corpus_versions[id_version_2]
         
         # identify, which one is earlier
-        date_version_1 = datetime.fromisoformat(version_1["date_from"])
-        date_version_2 = datetime.fromisoformat(version_2["date_from"])
+        date_version_1 = _parse_iso_date(version_1["date_from"])
+        date_version_2 = _parse_iso_date(version_2["date_from"])
 
         if date_version_1 < date_version_2:
             logging.debug("Version 1 is earlier.")
+            earlier_id = id_version_1
             earlier = version_1
             later = version_2
         else:
             logging.debug("Version 2 is ealier.")
+            earlier_id = id_version_2
             earlier = version_2
             later = version_1
 
         # We assume that the later has more plays...
-        new_plays = []
-        
-        for playname in later["playnames"]:
-            if playname not in earlier["playnames"]:
-                new_plays.append(playname)
+        # the set makes the lookup of the playnames of the earlier version fast, iterating over the list of the
+        # later version keeps the order of the plays
+        earlier_playnames = self.__get_playnames_set(earlier_id)
+        new_plays = [playname for playname in later["playnames"] if playname not in earlier_playnames]
 
         return new_plays
     
@@ -588,50 +1072,70 @@ class GitHubRepo():
         """
         assert self.__corpus_versions, "Expected that corpus versions have been generated"
 
-        version_ids = list(self.__corpus_versions.keys())
+        # the differences to the previous versions are calculated on the whole column,
+        # only the versions with more documents are compared file by file
+        df = self.get_corpus_versions_as_df(columns=["id", "running_number", "document_count"], sort=False)
+        df["previous_id"] = df["id"].shift()
+        df["new_documents_count"] = df["document_count"].diff()
 
-        n = 1
-        # start from beginning
-        for version_id in version_ids:
-            this_version = self.__corpus_versions[version_id]
-            #logging.debug(f"This version is {this_version['id']}.")
+        # test if these are consecutive versions
+        if (df["running_number"].diff().dropna() != 1).any():
+            logging.warning("These are not consecutive versions. Why?")
 
+        for version in df[df["new_documents_count"] > 0].itertuples():
+            logging.debug("Version %s has %d more plays than the previous version.", version.id, version.new_documents_count)
 
-            if n != len(version_ids):
-                # this should be the next version
-                #logging.debug(n)
-                next_version_id = version_ids[n:n+1][0]
-                #logging.debug(next_version_id)
-                next_version = self.__corpus_versions[next_version_id]
+            # write the document count then
+            self.__corpus_versions[version.id]["new_documents_count"] = int(version.new_documents_count)
 
-                #logging.debug(f"Next version is {next_version['id']}")
+            new_plays = self.compare_files_of_versions(version.previous_id, version.id)
+            logging.debug("New plays in the next version: ")
+            logging.debug(new_plays)
+            self.__corpus_versions[version.id]["new_playnames"] = new_plays
+        
+        self.__reset_corpus_version_indexes()
+    
+    def __reset_corpus_version_indexes(self):
+        """Reset the indexes created from the corpus versions, they are created again when needed"""
+        self.__play_added_in_version = None
+        self.__play_first_included_in_version = None
+        self.__versions_modifying_play = None
+        self.__versions_by_date = None
+        self.__versions_df = None
+        self.__playnames_sets = None
+        self.__source_distribution_by_version = dict()
+        self.__years_of_corpus_version_dfs = dict()
+        self.__years_of_corpus_version_series = dict()
+
+    def __get_playnames_set(self, version_id: str) -> frozenset:
+        """Get the playnames of a version as frozenset, e.g. to check if a play is included in the version"""
+        if self.__playnames_sets is None:
+            self.__playnames_sets = dict()
+
+        if version_id not in self.__playnames_sets:
+            self.__playnames_sets[version_id] = frozenset(self.__corpus_versions[version_id]["playnames"])
+
+        return self.__playnames_sets[version_id]
+
+    def __build_play_indexes(self):
+        """Create the indexes in which version a play was added and in which version it was included first
+        Goes through the versions once, so that looking up a play does not need to go through all versions.
+        """
+        play_added_in_version = dict()
+        play_first_included_in_version = dict()
 
-            else:
-                logging.debug("This is the last version.")
-                break
-            
-            # test if these are consecutive versions
-            if this_version["running_number"] + 1 != next_version["running_number"]:
-                logging.warning("These are not consecutive versions. Why?")
+        for key in self.__corpus_versions.keys():
+            for playname in self.__corpus_versions[key].get("new_playnames", []):
+                if playname not in play_added_in_version:
+                    play_added_in_version[playname] = key
             
-            if next_version["document_count"] > this_version["document_count"]:
-                diff = next_version["document_count"] - this_version["document_count"]
-                logging.debug(f"The next version has {str(diff)} more plays than this version.")
+            for playname in self.__corpus_versions[key].get("playnames", []):
+                if playname not in play_first_included_in_version:
+                    play_first_included_in_version[playname] = key
 
-                # write the document count then
-                self.__corpus_versions[next_version_id]["new_documents_count"] = diff
+        self.__play_added_in_version = play_added_in_version
+        self.__play_first_included_in_version = play_first_included_in_version
 
-                new_plays = self.compare_files_of_versions(this_version["id"], next_version["id"])
-                logging.debug("New plays in the next version: ")
-                logging.debug(new_plays)
-                self.__corpus_versions[next_version_id]["new_playnames"] = new_plays
-            
-            else:
-                #logging.debug("The next version has the same number of plays.")
-                pass
-
-            n = n + 1
-    
     def get_corpus_version_adding_play(self, playname: str = None):
         """Get the corpus version a play is added.
         This would allow to get the information since when a play is available in the corpus.
@@ -644,54 +1148,56 @@ class GitHubRepo():
         # also that they have the info which plays are added new
         assert type(playname) == str, "Expecting a playname as a string"
 
-        found_in_version = None
-        found_at_all = False
-
-        for key in self.__corpus_versions.keys():
-            if "new_playnames" in self.__corpus_versions[key]:
-                # new plays are added with this version, check if the playname is included
-                if playname in self.__corpus_versions[key]["new_playnames"]:
-                    found_in_version = self.__corpus_versions[key]
-                    logging.debug(f"Found in version {found_in_version['id']}")
-                    found_at_all = True
-                    return found_in_version
-        
-        if found_in_version is None:
-            logging.debug(f"Could not find {playname} in newly added plays. Could be there from the beginning.")
-            
-            logging.debug("Checking all versions...")
+        if self.__play_added_in_version is None or self.__play_first_included_in_version is None:
+            self.__build_play_indexes()
 
-            for key in self.__corpus_versions.keys():
-                if playname in self.__corpus_versions[key]["playnames"]:
-                    logging.debug(f"Found filename in the list of filenames in version {key} for the first time.")
-                    found_at_all = True
-                    break
+        if playname in self.__play_added_in_version:
+            found_in_version = self.__corpus_versions[self.__play_added_in_version[playname]]
+            logging.debug("Found in version %s", found_in_version["id"])
+            return found_in_version
         
-        if found_at_all == True:
-            logging.debug(f"Could find the file {playname}, but it was not added explicitly in a version. It might have been part of the corpus from the start.")
+        logging.debug("Could not find %s in newly added plays. Could be there from the beginning.", playname)
+
+        if playname in self.__play_first_included_in_version:
+            logging.debug("Found filename in the list of filenames in version %s for the first time.", self.__play_first_included_in_version[playname])
+            logging.debug("Could find the file %s, but it was not added explicitly in a version. It might have been part of the corpus from the start.", playname)
             # This is a very peculiar behaviour...
             return True
         else:
-            logging.warning(f"Could not find a file with filename {playname} at all.")
+            logging.warning("Could not find a file with filename %s at all.", playname)
             return False
 
-    def __fetch_data_folder_objects(self):
+    def __fetch_data_folder_objects(self, max_workers: int = None):
         """This fetches and stores the data folder objects
         Store them in self.__data_folder_objects = None
+
+        The data folder objects of the versions are fetched concurrently.
+
+        Args:
+            max_workers (int, optional): Number of concurrent requests. Defaults to __max_concurrent_requests
         """
         assert self.__corpus_versions, "Expected that corpus versions have been created"
         
         # Initialize the data folder as empty dictionary
         self.__data_folder_objects = dict()
+        self.__files_by_playname = None
+        self.__data_folder_objects_df = None
 
+        # get the api links to the tree objects of the versions
+        keys = []
+        urls = []
         for key in self.__corpus_versions.keys():
             if "data_folder_github_url" in self.__corpus_versions[key]:
-                # iterate over the versions and get the api link to the tree object
-                github_data_folder_api_url = self.__corpus_versions[key]["data_folder_github_url"]
-                self.__data_folder_objects[key] = self.api_get(url=github_data_folder_api_url)
-                logging.debug(f"Stored data folder object from {github_data_folder_api_url} of corpus version {key}.")
+                keys.append(key)
+                urls.append(self.__corpus_versions[key]["data_folder_github_url"])
             else:
-                logging.warning(f"Retrieving data folder url of version {key} failed.")
+                logging.warning("Retrieving data folder url of version %s failed.", key)
+        
+        with ThreadPoolExecutor(max_workers=max_workers or self.__max_concurrent_requests) as executor:
+            # the results are stored here and not in the threads, map keeps the order of the versions
+            for key, url, data_folder_object in zip(keys, urls, executor.map(lambda url: self.api_get(url=url), urls)):
+                self.__data_folder_objects[key] = data_folder_object
+                logging.debug("Stored data folder object from %s of corpus version %s.", url, key)
         
         return True
     
@@ -703,13 +1209,35 @@ class GitHubRepo():
         else:
             logging.debug("Fetching data from GitHub...")
             self.__fetch_data_folder_objects()
+
+    def get_data_folder_objects_as_df(self):
+        """Get the files in the trees of the data folder objects of all versions as data frame
+        One row per file and version with the columns version, name (path without .xml extension), path, size, sha and type.
+        The data frame is created once and reused.
+        """
+        assert self.__data_folder_objects, "Expect that data folder objects have been downloaded"
+
+        if self.__data_folder_objects_df is None:
+            records = [(version, file_object["path"], file_object.get("size"), file_object["sha"], file_object["type"])
+                       for version, data_folder_object in self.__data_folder_objects.items()
+                       for file_object in data_folder_object["tree"]]
+            df = pd.DataFrame.from_records(records, columns=["version", "path", "size", "sha", "type"])
+            df.insert(1, "name", df["path"].str.removesuffix(".xml"))
+            self.__data_folder_objects_df = df
+        
+        return self.__data_folder_objects_df
     
 
     def store_data_folder_objects(self, 
                      folder_name:str = "export",
                      file_name: str = None,
-                     ensure_ascii: bool = False):
-        """Save the downloaded data folder objects"""
+                     ensure_ascii: bool = False,
+                     compress: bool = False):
+        """Save the downloaded data folder objects
+        
+        Args:
+            compress (bool, optional): Write a gzip compressed file (.json.gz). Defaults to False
+        """
         if self.__data_folder_objects is None:
             logging.critical("No data folder objects created. Aborting.")
             raise Exception("No data folder objects created.")
@@ -718,17 +1246,18 @@ class GitHubRepo():
             file_name = f"{self.__repository_name}_data_folder_objects"
     
 
-        with open(f"{folder_name}/{file_name}.json", "w", encoding='utf8') as f:
-            f.write(json.dumps(self.__data_folder_objects, ensure_ascii=ensure_ascii))
+        self.__dump_json(self.__data_folder_objects, f"{folder_name}/{file_name}.json", 
+                         compress=compress, ensure_ascii=ensure_ascii)
     
     def import_data_folder_objects(self,
                        file:str = None):
         """Import saved data folder objects"""
-        with open(file, "r") as f:
-            data = json.load(f)
+        data = self.__load_json(file)
         
         self.__data_folder_objects = data
-        logging.info(f"Imported data folder objects from {file}.")
+        self.__files_by_playname = None
+        self.__data_folder_objects_df = None
+        logging.info("Imported data folder objects from %s.", file)
 
     def add_sum_of_document_sizes_to_versions(self):
         """Add the sum of the sizes of all documents in the data folder to the version
@@ -738,14 +1267,16 @@ class GitHubRepo():
         assert self.__corpus_versions, "Expect that corpus versions are generated"
         assert self.__data_folder_objects, "Expect that data folder objects have been downloaded"
         
+        # sum up the sizes of the files of all versions at once
+        sizes_sums = self.get_data_folder_objects_as_df().groupby("version", sort=False)["size"].sum()
+
         for version_key in self.__corpus_versions.keys():
+            if version_key not in self.__data_folder_objects:
+                logging.warning("No data folder object of version %s. Can't add the sum of document sizes.", version_key)
+                continue
             
-            sum_documents_size = 0
-            data_folder_object = self.__data_folder_objects[version_key]
-            files = data_folder_object["tree"]
-
-            for file in files:
-                sum_documents_size = sum_documents_size + file["size"]
+            # an empty data folder has no rows; int() to keep it JSON serializable
+            sum_documents_size = int(sizes_sums.get(version_key, 0))
         
             self.__corpus_versions[version_key]["document_sizes_sum"] = sum_documents_size
 
@@ -782,13 +1313,31 @@ class GitHubRepo():
             name (str): Name of the file/playname without .xml extension!
             version (str): commit sha/version id
         """
-        data_folder_tree_of_version = self.__data_folder_objects[version]["tree"]
-        file_data_in_list = list(filter(lambda item: item["path"] == f"{name}.xml", data_folder_tree_of_version))
-        if len(file_data_in_list) == 1:
-            return file_data_in_list[0]
-        else:
-            logging.debug(f"File {name} not found in this version.")
-            return None
+        file_data = self.__get_files_of_play(name).get(version)
+        if file_data is None:
+            logging.debug("File %s not found in this version.", name)
+        return file_data
+
+    def __build_files_by_playname_index(self):
+        """Create the index of the file objects of a play in the versions
+        Goes through the trees of the data folder objects once, so that looking up a file does not need to 
+        go through the whole tree of a version.
+        """
+        assert self.__data_folder_objects, "Expect that data folder objects have been downloaded"
+
+        files_by_playname = dict()
+        for version, data_folder_object in self.__data_folder_objects.items():
+            for file_object in data_folder_object["tree"]:
+                if file_object["path"].endswith(".xml"):
+                    files_by_playname.setdefault(file_object["path"][:-4], dict())[version] = file_object
+        
+        self.__files_by_playname = files_by_playname
+
+    def __get_files_of_play(self, name: str) -> dict:
+        """Get the file objects of a play by the ids of the versions that contain the play"""
+        if self.__files_by_playname is None:
+            self.__build_files_by_playname_index()
+        return self.__files_by_playname.get(name, {})
 
     def get_sizes_of_single_play_as_df(self, name:str = None, no_value:int = None):
         """Get the file sizes of single play from all versions
@@ -802,22 +1351,21 @@ class GitHubRepo():
             date_from=[],
             size=[]
         )
+
+        # the data of the file in the versions from the tree folder (data_folder_objects)
+        files_of_play = self.__get_files_of_play(name)
         
         for key in self.__corpus_versions.keys():
             
             data["version"].append(key)
             data["date_from"].append(self.__corpus_versions[key]["date_from"])
-            if "playnames" not in self.__corpus_versions[key]:
-                logging.debug(key)
-            if name in self.__corpus_versions[key]["playnames"]:
-                # get the data of a single file from the tree folder (data_folder_objects)
-                file_data = self.get_document_file_data_in_version(name=name, version=key)
-                data["size"].append(file_data["size"])
+            if key in files_of_play:
+                data["size"].append(files_of_play[key]["size"])
             else:
                 data["size"].append(no_value)
         
         df = pd.DataFrame(data)
-        df["date_from"] = pd.to_datetime(df["date_from"])
+        df["date_from"] = pd.to_datetime(df["date_from"], format="ISO8601")
 
         return df
     
@@ -857,25 +1405,26 @@ class GitHubRepo():
         """Get version IDs in which the file size of a given file changes
         This might mean that there are edits on this file
         TODO: implement a version of this that compares the current size to the size of the file in the prev version"""
-        # start with 0 size
+        files_of_play = self.__get_files_of_play(name)
+        # the versions containing the file (in the order of the versions) and the sizes of the file in them
+        keys = [key for key in self.__corpus_versions.keys() if key in files_of_play]
+        sizes = np.fromiter((files_of_play[key]["size"] for key in keys), dtype=np.int64, count=len(keys))
+        
+        # start with 0 size; the size changes if it differs from the size in the previous version containing the file
+        changed = np.diff(sizes, prepend=0) != 0
+        
         size_changes = []
-        size = 0
-        for key in self.__corpus_versions.keys():
-            file_data = self.get_document_file_data_in_version(version=key,name=name)
-            
-            if file_data is not None:
-                this_version_size = file_data["size"]
-                if this_version_size != size:
-                    logging.debug(file_data)
-                    logging.debug(f"was size {size}")
-                    logging.debug(f"this size {this_version_size}")
-                    data = dict(
-                        version=key,
-                        size=this_version_size,
-                        link=self.get_github_commit_url_of_version(version=key)
-                    )
-                    size_changes.append(data)
-                    size = this_version_size
+        for i in np.flatnonzero(changed):
+            key = keys[i]
+            logging.debug(files_of_play[key])
+            logging.debug("was size %d", sizes[i - 1] if i > 0 else 0)
+            logging.debug("this size %d", sizes[i])
+            data = dict(
+                version=key,
+                size=int(sizes[i]),
+                link=self.get_github_commit_url_of_version(version=key)
+            )
+            size_changes.append(data)
         
         return size_changes
     
@@ -892,67 +1441,27 @@ class GitHubRepo():
         url = f"https://api.github.com/repos/{self.__repository_owner}/{self.__repository_name}/contents/{self.__corpus_versions[version]['data_folder_name']}%2F{name}.xml?ref={version}"
         data = self.api_get(url=url)
         if exclude_content is True:
-            data.pop("content")
-            data.pop("encoding")
+            data = {key: value for key, value in data.items() if key not in ["content", "encoding"]}
         return data 
 
     def get_detailed_commits(self, 
                              force_download=False,
                              only_download=False):
-        """Return (and download) the detailed commits from GitHub"""
+        """Return (and download) the detailed commits from GitHub
+        
+        The detailed commits are downloaded with the REST API, one commit (and its pages) after the other per thread.
+        The GraphQL API can't replace this: the Commit object only has the number of changed files 
+        (changedFilesIfAvailable), but not the files with their status and previous filename that are needed 
+        to enrich the versions. Repeated downloads are avoided by the cache of the API responses instead.
+
+        Args:
+            force_download (bool, optional): Download all detailed commits again, even if they are cached. Defaults to False
+            only_download (bool, optional): Return True instead of the detailed commits. Defaults to False
+        """
         if self.__commits_detailed and force_download == False:
             return self.__commits_detailed
         else:
-            logging.debug("Fetching detailed commits from GitHub")
-            assert self.__commits, "Expect that commits have already beend downloaded."
-            # This is not ideal, I rely on having the commits already available
-            self.__commits_detailed = []
-            for commit in self.__commits:
-                sha = commit["sha"]
-                url = f"https://api.github.com/repos/{self.__repository_owner}/{self.__repository_name}/commits/{sha}"
-                
-                # Here I must handle it as it is done with get commits, i.e. get the whole response object
-                
-                paged_results = []
-                has_pages_left = True 
-                while has_pages_left is True:
-                    logging.debug(f"Will get results from {url}")
-                    r = self.api_get(url=url, return_response_object=True)
-                    
-                    try:
-                        link_headers = self.__parse_link_headers(r.headers)
-                    except:
-                        link_headers = None
-                    
-                    if link_headers == None:
-                        has_pages_left = False
-                    elif "next" not in link_headers:
-                        # this is the exit condition
-                        has_pages_left = False
-
-                    parsed_commits = json.loads(r.text)
-                    paged_results.append(parsed_commits)
-
-                    if link_headers == None:
-                        logging.debug("Nothing more to get")
-                        break
-                    elif "next" in link_headers:
-                        url=link_headers["next"]
-                    else:
-                        logging.debug("Nothing more to get")
-                        break
-                   
-                if len(paged_results) == 1:
-                    self.__commits_detailed.append(paged_results[0])
-                else:
-                    prepared_commit_object = paged_results[0]
-                    for page in paged_results[1:]:
-                       for file in page["files"]:
-                            prepared_commit_object["files"].append(file)
-                    self.__commits_detailed.append(prepared_commit_object)
-                
-                logging.debug(f"Downloaded {sha}.")
-                # Here the problem is, that the results are paged
+            self.__download_detailed_commits(force_download=force_download)
             
             if only_download == True:
                 logging.debug("Done downloading detailed commits.")
@@ -960,10 +1469,94 @@ class GitHubRepo():
             else:
                 return self.__commits_detailed
     
+    def __download_detailed_commits(self, force_download: bool = False, max_workers: int = None, 
+                                    stop_download: threading.Event = None):
+        """Download the detailed commits of all commits, see get_detailed_commits
+
+        Args:
+            force_download (bool, optional): Download the detailed commits again, even if they are cached. Defaults to False
+            max_workers (int, optional): Number of concurrent requests. Defaults to __max_concurrent_requests
+            stop_download (threading.Event, optional): If set, no more requests are sent and the download fails
+        """
+        logging.debug("Fetching detailed commits from GitHub")
+        assert self.__commits, "Expect that commits have already beend downloaded."
+        # This is not ideal, I rely on having the commits already available
+        # oldest first, the same order as the corpus versions
+        shas = [commit["sha"] for commit in reversed(self.__commits)]
+        
+        # the commits are fetched concurrently, the pages of a single commit one after the other
+        with ThreadPoolExecutor(max_workers=max_workers or self.__max_concurrent_requests) as executor:
+            # map keeps the order of the commits
+            self.__commits_detailed = list(executor.map(self.__fetch_detailed_commit, shas, 
+                                                        [force_download] * len(shas), [stop_download] * len(shas)))
+        self.__commits_detailed_by_sha = None
+
+    def __fetch_detailed_commit(self, sha: str, force_download: bool = False, 
+                                stop_download: threading.Event = None) -> dict:
+        """Get a single detailed commit from GitHub
+        The files of a commit are paged, the files of all pages are merged into the first page.
+
+        A commit can't change, the merged commit is kept in the cache of the API responses and not downloaded again
+        if the cache is stored and imported in a later run (see store_api_response_cache). Use force_download to 
+        download it anyway. Like in api_get, the cached body is parsed again, so the returned commit is not shared.
+        """
+        url = f"https://api.github.com/repos/{self.__repository_owner}/{self.__repository_name}/commits/{sha}"
+        commit_url = url
+
+        if force_download is False and commit_url in self.__api_response_cache:
+            logging.debug("Using cached detailed commit %s.", sha)
+            return json.loads(self.__api_response_cache[commit_url]["body"])
+        
+        # Here I must handle it as it is done with get commits, i.e. get the whole response object
+        
+        paged_results = []
+        has_pages_left = True 
+        while has_pages_left is True:
+            if stop_download is not None and stop_download.is_set():
+                raise Exception(f"Download of detailed commit {sha} stopped.")
+
+            logging.debug("Will get results from %s", url)
+            r = self.api_get(url=url, return_response_object=True)
+            if r.status_code != 200:
+                # don't merge (and cache) the error message as a page of the commit
+                raise Exception(f"Fetching {url} failed. Server returned status code {str(r.status_code)}.")
+
+            # parse the raw bytes, decoding them to a string first (r.text) is not necessary
+            parsed_commits = json.loads(r.content)
+            paged_results.append(parsed_commits)
+
+            # requests parses the Link header already, the relation (e.g. "next") is the key
+            if "next" in r.links:
+                url = r.links["next"]["url"]
+            else:
+                # this is the exit condition
+                logging.debug("Nothing more to get")
+                has_pages_left = False
+        
+        prepared_commit_object = paged_results[0]
+        if len(paged_results) > 1:
+            # the files of all pages in one list, the other pages are not needed anymore
+            prepared_commit_object["files"] = list(chain.from_iterable(page["files"] for page in paged_results))
+        
+        logging.debug("Downloaded %s.", sha)
+
+        # cached with the files of all pages, not only the ones of the first page
+        self.__api_response_cache[commit_url] = dict(
+            etag=None,
+            last_modified=None,
+            body=json.dumps(prepared_commit_object)
+        )
+        return prepared_commit_object
+
     def store_detailed_commits(self, 
                      folder_name:str = "export",
-                     file_name: str = None):
-        """Save the downloaded detailed commits"""
+                     file_name: str = None,
+                     compress: bool = False):
+        """Save the downloaded detailed commits
+        
+        Args:
+            compress (bool, optional): Write a gzip compressed file (.json.gz). Defaults to False
+        """
         if self.__commits_detailed is None:
             logging.critical("No detailed commits downloaded. Aborting.")
             raise Exception("No detailed commits downloaded.")
@@ -972,17 +1565,16 @@ class GitHubRepo():
             file_name = f"{self.__repository_name}_commits_detailed"
     
 
-        with open(f"{folder_name}/{file_name}.json", "w") as f:
-            f.write(json.dumps(self.__commits_detailed))
+        self.__dump_json(self.__commits_detailed, f"{folder_name}/{file_name}.json", compress=compress)
     
     def import_detailed_commits(self,
                        file:str = None):
         """Import saved detailed commits"""
-        with open(file, "r") as f:
-            data = json.load(f)
+        data = self.__load_json(file)
         
         self.__commits_detailed = data
-        logging.info(f"Imported detailed commits from {file}.")
+        self.__commits_detailed_by_sha = None
+        logging.info("Imported detailed commits from %s.", file)
 
 
     def enrich_corpus_versions_with_detailed_commits(self):
@@ -994,54 +1586,56 @@ class GitHubRepo():
         for commit in self.__commits_detailed:
             commit_id = commit["sha"]
             
-            if "files" in commit:
-                # these are the files like corpus.xml, ... others, like css
-                non_document_files_affected_count = 0
-                non_document_files_affected = []
-
-                #document files
-                # only count if the filename split by .xml is in the version[playnames]; it could be other files as well
-
-                documents_affected_count = 0
-                documents_modified_count = 0
-                documents_removed_count = 0
-                documents_added_count = 0
-                documents_renamed_count = 0
-
-                document_modified_playnames = []
-
-                for file in commit["files"]:
-                    file_path = file["filename"]
-                    # this includes the data_folder_name
-                    #logging.debug(f"filepath: {file_path}")
-                    #if f"{self.__corpus_versions[commit_id]['data_folder_name']}/" and ".xml" in file_path:
-                    if f"{self.__corpus_versions[commit_id]['data_folder_name']}/" in file_path:
-                        playname = file_path.split(f"{self.__corpus_versions[commit_id]['data_folder_name']}/")[1].replace(".xml", "")
-                        #logging.debug({playname})
-                        if playname in self.__corpus_versions[commit_id]["playnames"]:
-                            # this is a relevant file
-                            documents_affected_count = documents_affected_count + 1
-                            if file["status"] == "modified":
-                                documents_modified_count = documents_modified_count + 1
-                                document_modified_playnames.append(playname)
-                            elif file["status"] == "added":
-                                documents_added_count = documents_added_count + 1
-                            elif file["status"] == "renamed":
-                                documents_renamed_count = documents_renamed_count + 1
-                                #logging.debug(f"renamed {playname}")
-                            elif file["status"] == "removed":
-                                documents_removed_count = documents_removed_count + 1
-
-                            else:
-                                raise Exception(f"Unexpected status: {file['status']}")
-
-                    else:
-                        non_document_files_affected_count = non_document_files_affected_count + 1
-                        #logging.debug("Found non-play document affected by change")
-                        non_document_files_affected.append(file_path)
-                        if file["status"] not in ["added","renamed", "modified", "removed"]:
-                            raise Exception(f"{file['status']} not forseen.")
-            
+            if "files" not in commit:
+                logging.debug("No files in detailed commit %s.", commit_id)
+                continue
+
+            # the path of a document file starts with the data folder name, e.g. "tei/"
+            data_folder_prefix = f"{self.__corpus_versions[commit_id]['data_folder_name']}/"
+            # set, because it is checked for every file if it is a play
+            playnames = self.__get_playnames_set(commit_id)
+
+            # these are the files like corpus.xml, ... others, like css
+            non_document_files_affected_count = 0
+            non_document_files_affected = []
+
+            #document files
+            # only count if the filename without .xml is in the version[playnames]; it could be other files as well
+
+            documents_affected_count = 0
+            documents_modified_count = 0
+            documents_removed_count = 0
+            documents_added_count = 0
+            documents_renamed_count = 0
+
+            document_modified_playnames = []
+
+            for file in commit["files"]:
+                file_path = file["filename"]
+                status = file["status"]
+                # this includes the data_folder_name
+                if file_path.startswith(data_folder_prefix):
+                    if file_path.endswith(".xml") and file_path[len(data_folder_prefix):-4] in playnames:
+                        # this is a relevant file
+                        documents_affected_count += 1
+                        if status == "modified":
+                            documents_modified_count += 1
+                            document_modified_playnames.append(file_path[len(data_folder_prefix):-4])
+                        elif status == "added":
+                            documents_added_count += 1
+                        elif status == "renamed":
+                            documents_renamed_count += 1
+                        elif status == "removed":
+                            documents_removed_count += 1
+                        else:
+                            raise Exception(f"Unexpected status: {status}")
+
+                else:
+                    non_document_files_affected_count += 1
+                    non_document_files_affected.append(file_path)
+                    if status not in ["added","renamed", "modified", "removed"]:
+                        raise Exception(f"{status} not forseen.")
+        
             if documents_affected_count != 0:
                 self.__corpus_versions[commit_id]["documents_affected_count"] = documents_affected_count
             if documents_modified_count != 0:
@@ -1059,6 +1653,8 @@ class GitHubRepo():
             if non_document_files_affected != []: 
                 self.__corpus_versions[commit_id]["non_document_files_affected"] = non_document_files_affected
         
+        self.__reset_corpus_version_indexes()
+
         return True
     
     def get_corpus_versions_modifying_document(self, name:str = None):
@@ -1069,26 +1665,40 @@ class GitHubRepo():
         """
 
         assert self.__corpus_versions, "Experct corpus versions to be available"
+
+        if self.__versions_modifying_play is None:
+            self.__build_versions_modifying_play_index()
         
         results = []
         
-        for key in self.__corpus_versions.keys():
-            if "document_modified_playnames" in self.__corpus_versions[key]:
-                if name in self.__corpus_versions[key]["document_modified_playnames"]:
-                    version_info = dict(
-                        version=key,
-                        date_from=self.__corpus_versions[key]["date_from"],
-                        link=self.get_github_commit_url_of_version(version=key)
-                    )
-                    results.append(version_info)
+        for key in self.__versions_modifying_play.get(name, []):
+            version_info = dict(
+                version=key,
+                date_from=self.__corpus_versions[key]["date_from"],
+                link=self.get_github_commit_url_of_version(version=key)
+            )
+            results.append(version_info)
 
         return results
+
+    def __build_versions_modifying_play_index(self):
+        """Create the index which versions modify a play, the versions are in the same order as the corpus versions"""
+        versions_modifying_play = dict()
+        for key in self.__corpus_versions.keys():
+            for playname in self.__corpus_versions[key].get("document_modified_playnames", []):
+                versions_modifying_play.setdefault(playname, []).append(key)
+        
+        self.__versions_modifying_play = versions_modifying_play
         
 
     def get_detailed_commit(self, sha:str = None):
         """Get a single detailed commit"""
-        data = list(filter(lambda item: item["sha"] == sha, self.__commits_detailed))[0]
-        return data
+        if self.__commits_detailed_by_sha is None:
+            # built in a local variable first, so the index is only set when it is complete
+            commits_detailed_by_sha = {commit["sha"]: commit for commit in self.__commits_detailed}
+            self.__commits_detailed_by_sha = commits_detailed_by_sha
+        
+        return self.__commits_detailed_by_sha[sha]
     
     def get_corpus_version_fields(self):
         """List the available data fields on corpus versions; these are also the columns when requesting the data frame"""
@@ -1110,19 +1720,66 @@ class GitHubRepo():
             if corpus_name is None:
                 # guess it
                 corpus_name = self.__repository_name.lower().replace("dracor","")
-                logging.debug(f"Guessed corpus name {corpus_name}")
+                logging.debug("Guessed corpus name %s", corpus_name)
 
             url = f"{api_base}corpora/{corpus_name}"
-            r = requests.get(url=url)
-            if r.status_code == 200:
-                self.__latest_corpus_contents_from_api = json.loads(r.text)
+            # The response is kept in the cache of the API responses. If the cache is stored and imported in a later run 
+            # (this is done in the prepare step), the request is conditional and the contents are not sent again if they
+            # have not been modified. The Accept header of the GitHub API is replaced and the token is not sent to DraCor.
+            data = self.api_get(url=url, headers={"Accept": "application/json"}, send_access_token=False)
+            if data is not None:
+                self.__set_latest_corpus_contents(data)
                 return self.__latest_corpus_contents_from_api
             else:
-                logging.warning(f"Fetching latest listing of corpus contents via {url} failed. Server returned status code {str(r.status_code)}.")
+                logging.warning("Fetching latest listing of corpus contents via %s failed.", url)
                 return None
     
-    def __generate_source_key_from_name(self, source_name):
-        return source_name.lower().replace(" ", "_").replace(":","_")
+    def __set_latest_corpus_contents(self, data: dict):
+        """Set the latest corpus contents and reset everything calculated from them if they have changed
+        If there were no contents before, imported source distributions are kept; they have been calculated from the 
+        latest contents when they were stored.
+        """
+        if self.__latest_corpus_contents_from_api is not None and data != self.__latest_corpus_contents_from_api:
+            self.__latest_plays_by_name = None
+            self.__source_distribution_by_version = dict()
+            self.__years_of_corpus_version_dfs = dict()
+            self.__years_of_corpus_version_series = dict()
+        
+        self.__latest_corpus_contents_from_api = data
+
+    def store_latest_corpus_contents(self, 
+                                     folder_name:str = "export",
+                                     file_name: str = None,
+                                     compress: bool = False):
+        """Save the latest corpus contents fetched from the API
+        
+        Args:
+            compress (bool, optional): Write a gzip compressed file (.json.gz). Defaults to False
+        """
+        if self.__latest_corpus_contents_from_api is None:
+            logging.critical("No corpus contents fetched from the API. Aborting.")
+            raise Exception("No corpus contents fetched from the API.")
+
+        if file_name is None:
+            file_name = f"{self.__repository_name}_latest_corpus_contents"
+        
+        self.__dump_json(self.__latest_corpus_contents_from_api, f"{folder_name}/{file_name}.json", 
+                         compress=compress, ensure_ascii=False)
+    
+    def import_latest_corpus_contents(self,
+                                      file:str = None):
+        """Import saved latest corpus contents, they are not fetched from the API then"""
+        data = self.__load_json(file)
+        
+        self.__set_latest_corpus_contents(data)
+        logging.info("Imported latest corpus contents from %s.", file)
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def __generate_source_key_from_name(source_name):
+        """Generate the key of a source from its name
+        The keys are cached, the same source names are used by many plays in many versions."""
+        return source_name.lower().translate(GitHubRepo.__source_key_translation_table)
 
 
     def get_source_distribution_of_corpus_version(self, version:str = None):
@@ -1131,28 +1788,31 @@ class GitHubRepo():
          
         API Feature: play_digital_source_name – https://lod.dracor.org/api-ontology/play_digital_source_name 
         Name of the digital source of a play. Normally it is the name of the repository or project that provides a digital version of the play, e.g. 'Google Books', 'Wikisource', 'TextGrid Repository'.
-        """
 
-        sources = dict()
+        The result is calculated only once per version.
+        """
+        if version in self.__source_distribution_by_version:
+            return self.__source_distribution_by_version[version]
 
         # get the data to use
-        recent_api_plays_metadata = self.get_latest_corpus_contents_from_api()["plays"]
-
-        for playname in self.__corpus_versions[version]["playnames"]:
-            recent_api_play_data_list = list(filter(lambda play: play["name"] == playname, recent_api_plays_metadata))
-            if len(recent_api_play_data_list) == 1:
-                recent_play_data = recent_api_play_data_list[0]
-                source_name = recent_play_data["source"]["name"]
-
-                source_key = self.__generate_source_key_from_name(source_name)
-                if source_key not in sources:
-                    # first time this source is detected
-                    sources[source_key] = dict(
-                        source_name=source_name,
-                        plays_count=1
-                    )
-                else:
-                    sources[source_key]["plays_count"] = sources[source_key]["plays_count"] + 1
+        recent_api_plays_by_name = self.__get_latest_plays_by_name()
+
+        source_names = [recent_api_plays_by_name[playname]["source"]["name"] 
+                        for playname in self.__corpus_versions[version]["playnames"] 
+                        if playname in recent_api_plays_by_name]
+        
+        # the sources are in the order they are detected first
+        sources = dict()
+        for source_name, plays_count in Counter(source_names).items():
+            source_key = self.__generate_source_key_from_name(source_name)
+            if source_key not in sources:
+                sources[source_key] = dict(
+                    source_name=source_name,
+                    plays_count=plays_count
+                )
+            else:
+                # different names resulting in the same key, e.g. "Wikisource" and "wikisource"
+                sources[source_key]["plays_count"] = sources[source_key]["plays_count"] + plays_count
         
         result = dict(
             version=version,
@@ -1162,8 +1822,44 @@ class GitHubRepo():
             sources=sources
         )
 
+        self.__source_distribution_by_version[version] = result
+
         return result
     
+    def store_source_distributions(self, 
+                                   folder_name:str = "export",
+                                   file_name: str = None,
+                                   compress: bool = False):
+        """Save the calculated source distributions of the corpus versions
+        
+        Args:
+            compress (bool, optional): Write a gzip compressed file (.json.gz). Defaults to False
+        """
+        if file_name is None:
+            file_name = f"{self.__repository_name}_source_distributions"
+        
+        self.__dump_json(self.__source_distribution_by_version, f"{folder_name}/{file_name}.json", compress=compress)
+    
+    def import_source_distributions(self,
+                                    file:str = None):
+        """Import saved source distributions of corpus versions
+        Import them after the corpus versions, they are discarded if the corpus versions change.
+        """
+        data = self.__load_json(file)
+        
+        self.__source_distribution_by_version.update(data)
+        logging.info("Imported source distributions from %s.", file)
+    
+    def __get_latest_plays_by_name(self) -> dict:
+        """Get the metadata of the plays in the latest corpus contents from the API by the name of the play"""
+        if self.__latest_plays_by_name is None:
+            latest_plays_by_name = dict()
+            for play in self.get_latest_corpus_contents_from_api()["plays"]:
+                latest_plays_by_name[play["name"]] = play
+            self.__latest_plays_by_name = latest_plays_by_name
+        
+        return self.__latest_plays_by_name
+
     def get_source_distribution_of_corpus_version_as_df(self, version:str = None):
         """Returns a pandas data frame of the counts of plays per source"""
         source_distribution_data = self.get_source_distribution_of_corpus_version(version = version)
@@ -1198,7 +1894,7 @@ class GitHubRepo():
         
         self.__source_distributions = []
         for version in self.__corpus_versions.keys():
-            logging.debug(f"Generating source distributions of {version}.")
+            logging.debug("Generating source distributions of %s.", version)
             data = self.get_source_distribution_of_corpus_version(version=version)
             self.__source_distributions.append(data)
     
@@ -1229,18 +1925,16 @@ class GitHubRepo():
             if self.__source_distributions is None:
                 self.__generate_all_source_distributions()
             
-            all_source_keys = []
-        
+            # the distinct source keys of all versions (in the order they occur first) with the name of the source
+            source_names = dict()
             for source_distribution in self.__source_distributions:
-                source_keys = list(source_distribution["sources"].keys())
-                for key in source_keys:
-                    all_source_keys.append(key)
+                for source_key, source in source_distribution["sources"].items():
+                    source_names.setdefault(source_key, source["source_name"])
         
-            distinct_keys = set(all_source_keys)
-            for key in distinct_keys:
+            for source_key, source_name in source_names.items():
                 distinct_sources[source_key] = dict(
                         key=source_key,
-                        name=None,
+                        name=source_name,
                         rank=None
                     )            
 
@@ -1263,7 +1957,8 @@ class GitHubRepo():
     def get_latest_corpus_version(self):
         """Shortcut to get the latest corpus version"""
         if self.__corpus_versions is not None:
-            latest_key = list(self.__corpus_versions.keys())[-1:][0]
+            # the versions are ordered oldest first, the last key is the latest version
+            latest_key = next(reversed(self.__corpus_versions))
             return self.__corpus_versions[latest_key]
 
     def __add_ranks_to_sources(self, based_on_version:str = None):
@@ -1276,63 +1971,42 @@ class GitHubRepo():
         version = self.get_latest_corpus_version()
         source_distribution = self.get_source_distribution_of_corpus_version(version["id"])
 
-        sources_as_list = []
-        for key in source_distribution["sources"].keys():
-            sources_as_list.append(source_distribution["sources"][key])
-
-        sources_as_sorted_list = sorted(sources_as_list, key=lambda x: x["plays_count"])
-        sources_as_sorted_list.reverse()
+        sources_as_sorted_list = sorted(source_distribution["sources"].values(), key=itemgetter("plays_count"), reverse=True)
         logging.debug("Sorted List:")
         logging.debug(sources_as_sorted_list)
-        
-        
-
-        new_sources = dict()
 
-        n = 1
-        for item in sources_as_sorted_list:
+        for n, item in enumerate(sources_as_sorted_list, start=1):
             key = self.__generate_source_key_from_name(item["source_name"])
-            reorder_this_item = self.__sources[key]
-            reorder_this_item["rank"] = n
-            new_sources[key] = reorder_this_item
-            n = n + 1
-            
-        self.__sources = new_sources
+            self.__sources[key]["rank"] = n
         
+        # order by rank; sources that are not in the version keep the rank None and are kept at the end
+        self.__sources = dict(sorted(self.__sources.items(), 
+                                     key=lambda item: (item[1]["rank"] is None, item[1]["rank"] or 0)))
 
 
     def get_source_distribution_of_corpus_versions_as_df(self):
         """Plot source distribution over time"""
         if self.__source_distributions is None:
             self.__generate_all_source_distributions()
-        
-        data = dict(
-            version=[],
-            date_from=[],
-            document_count=[],
-            distinct_sources_count = []
-        )
 
         if self.__sources is None:
             self.__generate_distinct_sources(based_on="api")
+        
+        df = pd.DataFrame.from_records(self.__source_distributions, 
+                                       columns=["version", "date_from", "document_count", "distinct_sources_count"])
 
-        for source_key in self.__sources.keys():
-            data[source_key] = []
-
-        for source_distribution in self.__source_distributions:
-            data["version"].append(source_distribution["version"])
-            data["date_from"].append(source_distribution["date_from"])
-            data["document_count"].append(source_distribution["document_count"])
-            data["distinct_sources_count"].append(source_distribution["distinct_sources_count"])
-
-            for source_key in self.__sources.keys():
-                if source_key in source_distribution["sources"]:
-                    data[source_key].append(source_distribution["sources"][source_key]["plays_count"])
-                else:
-                    data[source_key].append(0)
+        # one row per version and source, pivoted to a column per source
+        records = [(source_distribution["version"], source_key, source["plays_count"]) 
+                   for source_distribution in self.__source_distributions 
+                   for source_key, source in source_distribution["sources"].items()]
+        plays_counts = pd.DataFrame.from_records(records, columns=["version", "source_key", "plays_count"]).pivot_table(
+            index="version", columns="source_key", values="plays_count", aggfunc="sum", fill_value=0)
         
-        df = pd.DataFrame(data=data)
-        df["date_from"] = pd.to_datetime(df["date_from"])
+        # keep all versions (also those without any known source) and the order of the sources, 0 if a version has no play of a source
+        plays_counts = plays_counts.reindex(index=df["version"], columns=list(self.__sources.keys()), fill_value=0)
+        
+        df = pd.concat([df, plays_counts.reset_index(drop=True)], axis=1)
+        df["date_from"] = pd.to_datetime(df["date_from"], format="ISO8601")
         return df
 
     def plot_source_distribution_of_corpus_versions(self):
@@ -1362,39 +2036,46 @@ class GitHubRepo():
             year_type (str, optional): Type of year: 'printed', 'written', 'premiered; defaults to 'normalized'
             non_numbers_to_nan (bool, optional): Turn all non numbers in years to NaN
         """
-        year_keys = ["yearNormalized", "yearPrinted",  "yearWritten", "yearPremiered"]
-        data = dict(
-            playname=[]
-        )
+        # a copy, changing the data frame must not change the stored one
+        return self.__get_years_of_corpus_version_df(version=version, non_numbers_to_nan=non_numbers_to_nan).copy()
+
+    def __get_years_of_corpus_version_df(self, version:str = None, non_numbers_to_nan=True):
+        """Get the data frame with the years of the plays in a corpus version
+        The data frame is created once per version and stored; don't change it.
+        """
+        if (version, non_numbers_to_nan) in self.__years_of_corpus_version_dfs:
+            return self.__years_of_corpus_version_dfs[(version, non_numbers_to_nan)]
+
+        df = self.__get_years_of_plays_as_df(playnames=self.__corpus_versions[version]["playnames"], 
+                                             non_numbers_to_nan=non_numbers_to_nan)
         
-        for year_key in year_keys:
-            data[year_key] = []
+        self.__years_of_corpus_version_dfs[(version, non_numbers_to_nan)] = df
+        return df
+
+    def __get_years_of_plays_as_df(self, playnames: list = None, non_numbers_to_nan=True) -> pd.DataFrame:
+        """Get the years of the plays from the latest API data as data frame, the index is the playname
+        
+        Args:
+            playnames (list, required): Names of the plays
+            non_numbers_to_nan (bool, optional): Turn all non numbers in years to NaN
+        """
+        year_keys = ["yearNormalized", "yearPrinted",  "yearWritten", "yearPremiered"]
 
-        api_data = self.get_latest_corpus_contents_from_api()
+        api_plays_by_name = self.__get_latest_plays_by_name()
 
-        for playname in self.__corpus_versions[version]["playnames"]:
-            
-            play_api_data_candidates = list(filter(lambda play: play["name"] == playname, api_data["plays"]))
-            if len(play_api_data_candidates) == 1:
-                play_api_data = play_api_data_candidates[0]
-            else:
-                # TODO: This needs to be fixed! the problem are renamed files
-                #logging.warning(f"Can not find {playname} in latest API data.")
-                play_api_data = None
-            
-            # TODO: here there is a problem if a play is renamed!
-            data["playname"].append(playname)
-            for year_key in year_keys:
-                if play_api_data is None:
-                    data[year_key].append(None)
-                else:
-                    data[year_key].append(play_api_data[year_key])
+        # TODO: This needs to be fixed! the problem are renamed files, they are not in the latest API data
+        plays_api_data = [api_plays_by_name.get(playname) for playname in playnames]
+        
+        # a list per column; this also gives the same (float) dtypes as before if there are no plays at all
+        data = dict(playname=list(playnames))
+        for year_key in year_keys:
+            data[year_key] = [None if play_api_data is None else play_api_data[year_key] for play_api_data in plays_api_data]
         
         df = pd.DataFrame(data).set_index("playname")
-        #convert columns to numeric – does not work
         if non_numbers_to_nan is True:
-            for key in year_keys:
-                df[key] = pd.to_numeric(df[key], errors='coerce')
+            for year_key in year_keys:
+                df[year_key] = pd.to_numeric(df[year_key], errors='coerce')
+        
         return df
 
     def plot_years_of_corpus_version(self, version:str = None, year_type:str = "normalized"):
@@ -1404,11 +2085,9 @@ class GitHubRepo():
         """
         assert version is not None, "Version ID must be supplied."
 
-        df = self.get_years_of_corpus_version_as_df(version=version)
-
-        column_name = f"year{year_type.capitalize()}"
+        years = self.__get_years_of_corpus_version_series(version=version, year_type=year_type)
 
-        df.boxplot(column=column_name)
+        years.to_frame().boxplot(column=years.name)
 
 
     def get_min_max_years_of_corpus_version(self, version:str = None, year_type:str = "normalized") -> dict:
@@ -1427,35 +2106,62 @@ class GitHubRepo():
         """
         assert version is not None, "Expects a version id."
         
-        df = self.get_years_of_corpus_version_as_df(version=version)
+        # NumPy directly, the pandas reductions are slow compared to the few values of a version
+        years = self.__get_years_of_corpus_version_series(version=version, year_type=year_type).to_numpy()
 
+        # np.nanmin and np.nanmax fail for no values and warn if all are NaN; pandas returned NaN then
+        if years.size == 0 or np.isnan(years).all():
+            return np.float64(np.nan), np.float64(np.nan)
+
+        return np.nanmin(years), np.nanmax(years)
+
+    def __get_years_of_corpus_version_series(self, version:str = None, year_type:str = "normalized") -> pd.Series:
+        """Get the years of a single type of the plays in a corpus version, non numbers are NaN
+        Only the requested type of year is looked up and converted. The series is created once per version and 
+        type of year and stored; don't change it.
+        """
         column_name = f"year{year_type.capitalize()}"
 
-        return df[column_name].min(), df[column_name].max() 
+        if (version, column_name) in self.__years_of_corpus_version_series:
+            return self.__years_of_corpus_version_series[(version, column_name)]
+
+        api_plays_by_name = self.__get_latest_plays_by_name()
+        playnames = self.__corpus_versions[version]["playnames"]
+        
+        # TODO: renamed files are not in the latest API data, their years are NaN
+        values = [api_plays_by_name[playname][column_name] if playname in api_plays_by_name else None 
+                  for playname in playnames]
+        years = pd.Series(pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(), 
+                          index=pd.Index(playnames, name="playname"), name=column_name)
+        
+        self.__years_of_corpus_version_series[(version, column_name)] = years
+        return years
     
     def get_min_max_years_of_corpus_versions_as_df(self, year_type:str = "normalized"):
         """Returns all min max years of all corpus versions"""
         
         year_column_name = f"year{year_type.capitalize()}"
 
-        data = dict(
-            version=[],
-            date_from=[],
-            year_min = [],
-            year_max=[]
-        )
-        
-        
-        for key in self.__corpus_versions.keys():
-            data["version"].append(key)
-            data["date_from"].append(self.__corpus_versions[key]["date_from"])
-            
-            year_vals = self.get_min_max_years_of_corpus_version(version=key, year_type=year_type)
-            data["year_min"].append(year_vals[0])
-            data["year_max"].append(year_vals[1])
-        
-        df = pd.DataFrame(data=data)
-        df["date_from"] = pd.to_datetime(df["date_from"])
+        api_plays_by_name = self.__get_latest_plays_by_name()
+
+        # one row per play in a version, with the year of the play from the latest API data
+        records = [(key, api_plays_by_name[playname][year_column_name] if playname in api_plays_by_name else None)
+                   for key in self.__corpus_versions.keys()
+                   for playname in self.__corpus_versions[key]["playnames"]]
+        years = pd.DataFrame.from_records(records, columns=["version", "year"])
+        years["year"] = pd.to_numeric(years["year"], errors='coerce')
+
+        # min and max of all versions at once; versions without any plays get NaN
+        min_max_years = years.groupby("version", sort=False)["year"].agg(["min", "max"]).reindex(
+            list(self.__corpus_versions.keys()))
+
+        # the dates of the versions are already parsed in the versions data frame
+        df = pd.DataFrame(dict(
+            version=list(self.__corpus_versions.keys()),
+            date_from=self.__get_versions_df()["date_from"].to_numpy(),
+            year_min=min_max_years["min"].to_numpy(),
+            year_max=min_max_years["max"].to_numpy()
+        ))
 
         return df
     
@@ -1465,42 +2171,73 @@ class GitHubRepo():
         
         df.plot()
 
-    def __fetch_and_prepare_analysis_data(self):
+    def __store_prepared_data(self, store_method, description: str) -> bool:
+        """Store data prepared in __fetch_and_prepare_analysis_data in the folder 'tmp'
+        If the data can't be written, a warning is logged and preparing the data goes on; the data is still available 
+        in memory and can be stored later.
+
+        Args:
+            store_method: One of the store methods, e.g. self.store_commits
+            description (str): What is stored, used in the warning
+        """
+        try:
+            store_method(folder_name="tmp")
+            return True
+        except OSError as e:
+            logging.warning("Could not store %s in folder 'tmp': %s", description, e)
+            return False
+
+    def __fetch_and_prepare_analysis_data(self, use_graphql_api: bool = False):
         """Download the data needed for the analysis from GitHub and prepare the versions
-        This might take a long time depending on the number of commits in a repository"""
+        This might take a long time depending on the number of commits in a repository
 
-        logging.info(f"Downloading data from GitHub and preparing for analysis. Depending on the number of commits this will take a long time.")
+        Args:
+            use_graphql_api (bool, optional): Get the commits and the files of the versions with the GraphQL API.
+        """
+
+        logging.info("Downloading data from GitHub and preparing for analysis. Depending on the number of commits this will take a long time.")
 
         #Create a folder
         if not os.path.exists("tmp"):
             os.makedirs("tmp")
 
+        # Reuse the responses of the GitHub API stored by an earlier run (see below), unless responses have been imported 
+        # already (import_api_response_cache). Trees and commits are not downloaded again, the rest is requested conditionally.
+        api_response_cache_file = f"tmp/{self.__repository_name}_api_response_cache.json"
+        if len(self.__api_response_cache) == 0 and os.path.exists(api_response_cache_file):
+            try:
+                self.import_api_response_cache(file=api_response_cache_file)
+            except (OSError, ValueError) as e:
+                logging.warning("Could not import stored responses of the GitHub API from %s: %s", api_response_cache_file, e)
+
         # There is a certain order of the download and enrichment-steps (because of the chaotic way the module came into being)
+        # The enrichment steps are not merged into a single pass: each one needs a different download (trees, data folder
+        # objects, detailed commits), the downloads of steps 5 to 7 overlap, and each step goes over its data only once.
         # get the commits overview, these is the basis for the first set of versions
-        self.get_commits(force_download=True)
-        try:
-            self.store_commits(folder_name="tmp")
-            logging.info("Step 1: Downloaded and stored commits.")
-        except:
-            pass
+        if use_graphql_api is True:
+            # this also creates the versions and adds the files to them (steps 2 and 3)
+            self.fetch_commits_and_files_with_graphql()
+        else:
+            self.get_commits(force_download=True)
+        self.__store_prepared_data(self.store_commits, "commits")
+        logging.info("Step 1: Downloaded and stored commits.")
 
         self.__data_download_at = datetime.now()
         
         # create the intial versions based on the commits
-        self.__transform_commits_to_versions()
+        if use_graphql_api is False:
+            self.__transform_commits_to_versions()
         logging.info("Step 2: Generated initial versions based on commits. Enriching ...")
         # by then self.__corpus_versions should be available
         # store it, can overwrite after enriching
-        try:
-            self.store_corpus_versions(folder_name="tmp")
-            logging.info("Downloaded and stored initial corpus versions.")
-        except:
-            pass
+        self.__store_prepared_data(self.store_corpus_versions, "initial corpus versions")
+        logging.info("Downloaded and stored initial corpus versions.")
 
 
         # this might add information which files are in a version
         # this is not ideal, it failed at some point
-        self.add_files_to_versions()
+        if use_graphql_api is False:
+            self.add_files_to_versions()
         logging.info("Step 3: Added files to versions.")
         # There is a problem, because in the early version, for example, of GerDraCor
         # the data folder is not "tei" but "data"
@@ -1509,40 +2246,56 @@ class GitHubRepo():
         self.add_new_play_info_to_corpus_versions()
         logging.info("Step 4: Added information when a play was first added to corpus.")
 
-        # Download the data folder objects; these represent the files of a commit
-        # needed for the information about the sizes of files in a corpus
-        self.__fetch_data_folder_objects()
+        # The detailed commits (step 7) only depend on the commits, they are downloaded in the background
+        # while the data folder objects are downloaded and the sizes are added (steps 5 and 6).
+        # Both downloads share the maximum number of concurrent requests.
+        max_workers = max(1, self.__max_concurrent_requests // 2)
+        stop_download = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=1)
         try:
-            self.store_data_folder_objects(folder_name="tmp")
+            # get the detailed commits of the commits downloaded in step 1; a commit can't change, the ones in the cache 
+            # of the API responses are not downloaded again
+            detailed_commits_download = executor.submit(self.__download_detailed_commits, False, max_workers, stop_download)
+
+            # Download the data folder objects; these represent the files of a commit
+            # needed for the information about the sizes of files in a corpus
+            self.__fetch_data_folder_objects(max_workers=max_workers)
+            self.__store_prepared_data(self.store_data_folder_objects, "data folder objects")
             logging.info("Step 5: Downloaded and stored data folder objects.")
-        except:
-            pass
 
-        # adds the cumulative sum of filesizes to versions
-        self.add_sum_of_document_sizes_to_versions()
-        logging.info("Step 6: Added sum of document sizes to versions.")
+            # adds the cumulative sum of filesizes to versions
+            self.add_sum_of_document_sizes_to_versions()
+            logging.info("Step 6: Added sum of document sizes to versions.")
 
-        # get the detailed commit
-        self.get_detailed_commits(force_download=True)
-        try:
-            self.store_detailed_commits(folder_name="tmp")
-            logging.info("Step 7: Downloaded and stored detailed commits. Enriching versions...")
-        except:
-            pass
+            # raises the exception if downloading the detailed commits failed
+            detailed_commits_download.result()
+        finally:
+            # If steps 5 or 6 failed, no more detailed commits are requested. Only the requests already sent are waited
+            # for, nothing changes the cache or the detailed commits after the error has been raised.
+            stop_download.set()
+            executor.shutdown(wait=True)
+        
+        self.__store_prepared_data(self.store_detailed_commits, "detailed commits")
+        logging.info("Step 7: Downloaded and stored detailed commits. Enriching versions...")
+
+        # the info about plays taken from the latest version in DraCor; the response is kept with the responses 
+        # of the GitHub API stored below, a later run only sends a conditional request
+        self.get_latest_corpus_contents_from_api()
+        logging.info("Fetched latest corpus contents from the DraCor API.")
+
+        # the responses include the trees and the detailed commits, these never change. When the stored responses 
+        # are imported (import_api_response_cache) in a later run, they don't need to be downloaded again.
+        # Stored only now, the responses must not be changed by a download while they are written.
+        self.__store_prepared_data(self.store_api_response_cache, "responses of the GitHub API")
+        logging.info("Stored responses of the GitHub API.")
 
         # based on the above, do an enrichment. This adds the information what has happend to a file in 
         # a version, e.g. modified n files...
         self.enrich_corpus_versions_with_detailed_commits()
         logging.info("Step 8: Enriched versions with information from detailed commits.")
 
-        try:
-            self.store_corpus_versions(folder_name="tmp")
-            logging.info("Stored enriched corpus versions.")
-        except:
-            pass
-
-        # this can also be cached: the info about plays taken from the latest version in DraCor
-        #self.get_latest_corpus_contents_from_api()
+        self.__store_prepared_data(self.store_corpus_versions, "enriched corpus versions")
+        logging.info("Stored enriched corpus versions.")
 
         # generate the distribution of sources
         #self.__generate_all_source_distributions()
@@ -1551,10 +2304,8 @@ class GitHubRepo():
 
     def get_ids_of_corpus_versions_renaming_documents(self):
         """Get a list of commit ids of corpus versions that rename one or more plays"""
-        ids = []
-        for key in self.__corpus_versions.keys():
-            if "documents_renamed_count" in self.__corpus_versions[key]:
-                ids.append(key)
+        df = self.__get_versions_df()
+        ids = df.index[df["documents_renamed_count"].notna()].tolist()
         return ids
     
     def get_ids_of_corpus_versions_modifying_all_documents(self):
@@ -1562,13 +2313,22 @@ class GitHubRepo():
         Compares the values of the fields "documents_modified_count" and document_count. If they match all documents have been modified
         in this version
         """
-        ids = []
-        for key in self.__corpus_versions.keys():
-            if "documents_modified_count" in self.__corpus_versions[key]:
-                if self.__corpus_versions[key]["documents_modified_count"] == self.__corpus_versions[key]["document_count"]:
-                    ids.append(key)  
+        df = self.__get_versions_df()
+        # versions without "documents_modified_count" are NaN and never equal
+        ids = df.index[df["documents_modified_count"] == df["document_count"]].tolist()
         return ids
 
+    def __get_versions_df(self) -> pd.DataFrame:
+        """Get the fields of the versions used to select versions as data frame
+        The data frame is created once and reset with the other indexes if the corpus versions change.
+        """
+        if self.__versions_df is None:
+            self.__versions_df = self.get_corpus_versions_as_df(
+                columns=["id", "date_from", "document_count", "documents_modified_count", "documents_renamed_count"],
+                sort=False).set_index("id")
+        
+        return self.__versions_df
+
 
     def get_renamed_files(self, 
                           exclude_versions:list = []):
@@ -1577,18 +2337,16 @@ class GitHubRepo():
         Args:
             exclude_versions (list, optional): Version numbers/commit ids to exclude
         """
-        renamed = []
-        for detailed_commit in self.__commits_detailed:
-            # don't do this if a version is filtered out; maybe I don't want to see the batch renamings of all files
-            if detailed_commit["sha"] not in exclude_versions:
-                for file in detailed_commit["files"]:
-                    if file["status"] == "renamed":
-                        rename_info = dict(
-                            version=detailed_commit["sha"],
-                            previous_filename=file["previous_filename"],
-                            new_filename=file["filename"]  
-                        )
-                        renamed.append(rename_info)
+        # don't do this if a version is filtered out; maybe I don't want to see the batch renamings of all files
+        excluded_versions = set(exclude_versions)
+        
+        renamed = [dict(
+                       version=detailed_commit["sha"],
+                       previous_filename=file["previous_filename"],
+                       new_filename=file["filename"]
+                   )
+                   for detailed_commit in self.__commits_detailed if detailed_commit["sha"] not in excluded_versions
+                   for file in detailed_commit.get("files", []) if file["status"] == "renamed"]
         return renamed
     
     def get_corpus_version_ids_in_date_range(self, date_start:str = None, date_end:str = None):
@@ -1596,28 +2354,46 @@ class GitHubRepo():
         start = datetime.fromisoformat(date_start)
         end = datetime.fromisoformat(date_end)
 
-        result_version_ids = []
+        if self.__versions_by_date is None:
+            self.__build_versions_by_date_index()
+        
+        dates, positions, version_ids = self.__versions_by_date
+
+        # the versions with start <= date <= end are next to each other in the sorted dates
+        first = np.searchsorted(dates, np.datetime64(start), side="left")
+        last = np.searchsorted(dates, np.datetime64(end), side="right")
 
-        for version_id in self.__corpus_versions.keys():
-            version_date = datetime.fromisoformat(self.__corpus_versions[version_id]["date_from"]).replace(tzinfo=None)
-            if start <= version_date and end >= version_date:
-                result_version_ids.append(version_id)
+        # the dates of commits are not always in the order of the commits; return the ids in the order of the versions
+        order = np.argsort(positions[first:last])
+        result_version_ids = version_ids[first:last][order].tolist()
 
         return result_version_ids
     
+    def __build_versions_by_date_index(self):
+        """Create the index of the versions sorted by date (date_from without timezone)
+        The dates are parsed once, looking up the versions in a date range does not need to go through all versions.
+        The dates, positions and ids are NumPy arrays, so that the range can be searched and sliced without Python loops.
+        """
+        versions_by_date = sorted(
+            (_parse_iso_date(version["date_from"]).replace(tzinfo=None), position, version_id)
+            for position, (version_id, version) in enumerate(self.__corpus_versions.items()))
+        
+        self.__versions_by_date = (
+            np.array([date for date, _, _ in versions_by_date], dtype="datetime64[us]"),
+            np.array([position for _, position, _ in versions_by_date], dtype=np.int64),
+            np.array([version_id for _, _, version_id in versions_by_date], dtype=object)
+        )
+    
     def get_plays_in_corpus_versions_in_date_range(self, date_start:str = None, date_end:str = None):
         """Get play names of plays in corpus versions that fall within a time range"""
         corpus_version_ids = self.get_corpus_version_ids_in_date_range(date_start=date_start, date_end=date_end)
 
-        unique_playnames = []
-
-        for version_id in corpus_version_ids:
-            playnames = self.__corpus_versions[version_id]["playnames"]
-            for playname in playnames:
-                if playname not in unique_playnames:
-                    unique_playnames.append(playname)
+        # dict instead of a set to keep the order in which the plays occur first
+        unique_playnames = dict.fromkeys(playname 
+                                         for version_id in corpus_version_ids 
+                                         for playname in self.__corpus_versions[version_id]["playnames"])
         
-        return unique_playnames
+        return list(unique_playnames)
 
 
     def get_years_of_plays_in_corpus_version_in_date_range_as_df(self, date_start:str = None, date_end:str = None, non_numbers_to_nan=True):
@@ -1634,39 +2410,7 @@ class GitHubRepo():
             year_type (str, optional): Type of year: 'printed', 'written', 'premiered; defaults to 'normalized'
             non_numbers_to_nan (bool, optional): Turn all non numbers in years to NaN
         """
-        year_keys = ["yearNormalized", "yearPrinted",  "yearWritten", "yearPremiered"]
-        data = dict(
-            playname=[]
-        )
-        
-        for year_key in year_keys:
-            data[year_key] = []
-
-        api_data = self.get_latest_corpus_contents_from_api()
-
-        for playname in self.get_plays_in_corpus_versions_in_date_range(date_start=date_start, date_end=date_end):
-            
-            play_api_data_candidates = list(filter(lambda play: play["name"] == playname, api_data["plays"]))
-            if len(play_api_data_candidates) == 1:
-                play_api_data = play_api_data_candidates[0]
-            else:
-                # TODO: This needs to be fixed! the problem are renamed files
-                #logging.warning(f"Can not find {playname} in latest API data.")
-                play_api_data = None
-            
-            # TODO: here there is a problem if a play is renamed!
-            data["playname"].append(playname)
-            for year_key in year_keys:
-                if play_api_data is None:
-                    data[year_key].append(None)
-                else:
-                    data[year_key].append(play_api_data[year_key])
-        
-        df = pd.DataFrame(data).set_index("playname")
-        #convert columns to numeric – does not work
-        if non_numbers_to_nan is True:
-            for key in year_keys:
-                df[key] = pd.to_numeric(df[key], errors='coerce')
-        return df
+        playnames = self.get_plays_in_corpus_versions_in_date_range(date_start=date_start, date_end=date_end)
+        return self.__get_years_of_plays_as_df(playnames=playnames, non_numbers_to_nan=non_numbers_to_nan)
 
                     